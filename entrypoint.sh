@@ -55,6 +55,11 @@ if [ -n "$PAGE_OFFSET" ]; then
     ARGS+=("--page-offset" "$PAGE_OFFSET")
 fi
 
+# Add worker count if provided; the indexer runs without worker processes by default
+if [ -n "$WORKERS" ]; then
+    ARGS+=("--workers" "$WORKERS")
+fi
+
 echo "Starting Legal Index Generator..."
 echo "Input PDF: $INPUT_PDF"
 echo "Output File: $OUTPUT_FILE"
@@ -63,6 +68,7 @@ echo "Include Subcategories: $INCLUDE_SUBCATEGORIES"
 echo "Terms Only: $TERMS_ONLY"
 echo "Show Stats: $SHOW_STATS"
 echo "Page Offset: $PAGE_OFFSET"
+echo "Workers: ${WORKERS:-1}"
 
 # Load custom terms if provided
 if [ -n "$CUSTOM_TERMS_FILE" ] && [ -f "$CUSTOM_TERMS_FILE" ]; then
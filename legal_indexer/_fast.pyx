@@ -0,0 +1,71 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""Compiled inner loops; see _merge_hits in indexer.py and _pages_to_str in utils.py for the pure-Python versions."""
+from cpython.dict cimport PyDict_GetItem, PyDict_SetItem
+from cpython.object cimport PyObject
+from libc.stdlib cimport free, malloc
+from sys import intern
+
+
+def merge_hits(dict all_entries, object arrival, object hits, object page_num, tuple headings):
+    """Add a page's (term, category, snippet) hits to the entry store; return whether any was new."""
+    cdef bint added = False
+    cdef object term, category, snippet
+    cdef tuple key, entry
+    cdef dict entries
+    cdef PyObject *found
+    for term, category, snippet in hits:
+        key = (intern(term), intern(category))
+        found = PyDict_GetItem(all_entries, key)
+        if found is NULL:
+            entries = {}
+            PyDict_SetItem(all_entries, key, entries)
+        else:
+            entries = <dict>found
+        entry = (page_num, snippet, headings)
+        if PyDict_GetItem(entries, entry) is NULL:
+            PyDict_SetItem(entries, entry, next(arrival))
+            added = True
+    return added
+
+
+def format_pages(tuple pages):
+    """Join page numbers for display, as in "1, 2, 5"."""
+    cdef Py_ssize_t i, n = len(pages), pos = 0, start, end
+    cdef long long page
+    cdef unsigned long long rest
+    cdef char tmp
+    # Each number takes at most 20 characters, plus the ", " before it
+    cdef char *buf = <char *>malloc(n * 22 + 1)
+    if buf is NULL:
+        raise MemoryError()
+    try:
+        for i in range(n):
+            page = pages[i]
+            if i:
+                buf[pos] = b','
+                buf[pos + 1] = b' '
+                pos += 2
+            if page < 0:
+                buf[pos] = b'-'
+                pos += 1
+                rest = <unsigned long long>(-(page + 1)) + 1
+            else:
+                rest = page
+            # Digits come out lowest first and are reversed in place
+            start = pos
+            while True:
+                buf[pos] = <char>(48 + rest % 10)
+                pos += 1
+                rest //= 10
+                if rest == 0:
+                    break
+            end = pos - 1
+            while start < end:
+                tmp = buf[start]
+                buf[start] = buf[end]
+                buf[end] = tmp
+                start += 1
+                end -= 1
+        return buf[:pos].decode('ascii')
+    finally:
+        free(buf)
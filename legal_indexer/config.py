@@ -2,17 +2,19 @@
 # Enhanced Legal Patterns
 STATUTORY_PATTERNS = {
     'statutory_references': [
-        r'(?:N\.Y\.|New York)\s*[A-Za-z\s]*\s*(?:Law|Code)\s*(?:\u00a7|Section|§)\s*[\d\-\.]+(?:\([a-z0-9\-]+\))?',
-        r'CPLR\s*(?:\u00a7|§)?\s*[\d\-\.]+(?:\([a-z0-9\-]+\))?',
-        r'CPL\s*(?:\u00a7|§)?\s*[\d\-\.]+(?:\([a-z0-9\-]+\))?',
+        r'(?:N\.Y\.|New York)\s*[A-Za-z\s]*\s*(?:Law|Code)\s*(?:Section|§)\s*[\d\-\.]+(?:\([a-z0-9\-]+\))?',
+        r'CPLR\s*§?\s*[\d\-\.]+(?:\([a-z0-9\-]+\))?',
+        r'CPL\s*§?\s*[\d\-\.]+(?:\([a-z0-9\-]+\))?',
         r'Rule\s*[\d\-\.]+(?:\([a-z0-9\-]+\))?',
-        r'(?:\u00a7|§)\s*[\d\-\.]+(?:\([a-z0-9\-]+\))*',
+        r'§\s*[\d\-\.]+(?:\([a-z0-9\-]+\))*',
     ]
 }
 
 CASE_LAW_PATTERNS = {
     'case_law_references': [
-        r'[A-Z][a-zA-Z\s&\.\-]{2,30}\s+v\.?\s+[A-Z][a-zA-Z\s&\.\-]{2,30}',
+        # Party names are up to five whitespace-separated words, so the
+        # word and separator classes never overlap and cannot backtrack
+        r'[A-Z][A-Za-z&.\-]{1,30}(?:\s+[A-Z&.\-][A-Za-z&.\-]{0,30}){0,4}\s+v\.?\s+[A-Z][A-Za-z&.\-]{1,30}(?:\s+[A-Z&.\-][A-Za-z&.\-]{0,30}){0,4}',
         r'\d{1,3}\s+[A-Z][a-zA-Z\s\.]+\s+\d{1,4}(?:\s+\([A-Za-z\.\s\d]+\))?',
         r'(?:App\.?\s*Div\.?|Ct\.?\s*App\.?|S\.?\s*Ct\.?)',
     ]
@@ -24,6 +26,18 @@ GENERAL_PATTERNS = {
 }
 
 
+# Lowercase literals of which at least one must occur for a pattern to match.
+# Patterns without a reliable literal are not listed and always run.
+PATTERN_ANCHORS = {
+    STATUTORY_PATTERNS['statutory_references'][0]: ('section', '§'),
+    STATUTORY_PATTERNS['statutory_references'][1]: ('cplr',),
+    STATUTORY_PATTERNS['statutory_references'][2]: ('cpl',),
+    STATUTORY_PATTERNS['statutory_references'][3]: ('rule',),
+    STATUTORY_PATTERNS['statutory_references'][4]: ('§',),
+    CASE_LAW_PATTERNS['case_law_references'][2]: ('app', 'ct'),
+    GENERAL_PATTERNS['subdivisions']: ('(',),
+}
+
 # Enhanced Phrase Patterns
 PHRASE_PATTERNS = [
     # Procedural concepts
@@ -1,58 +1,167 @@
 
 import fitz  # PyMuPDF
-import PyPDF2
+import multiprocessing
 import os
-from typing import Dict
-from PIL import Image
-import pytesseract
+import tempfile
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, Iterator, Optional, Tuple, Union
 
-def _ocr_page(pix: fitz.Pixmap) -> str:
+def process_pool_context():
+    """Start method for the worker pools: never a plain fork.
+
+    Pools are started while other threads are running (OCR threads, another
+    pool's management thread). A forked child inherits their locks in
+    whatever state they were in and can deadlock, so workers start from a
+    fork server, or a fresh interpreter where there is none.
+    """
+    if 'forkserver' not in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('spawn')
+    context = multiprocessing.get_context('forkserver')
+    # Imported once by the server rather than by every worker it starts
+    context.set_forkserver_preload(['legal_indexer.indexer', 'legal_indexer.utils'])
+    return context
+
+def _page_image(page: fitz.Page, image_format: str = "ppm") -> bytes:
+    """Render a page to an image file's bytes for OCR."""
+    return page.get_pixmap().tobytes(image_format)
+
+def _ocr_image(image: bytes, image_format: str = "ppm") -> str:
     """Perform OCR on a single page image."""
+    # Imported on first use; text-only documents never need it
+    import pytesseract
+
+    # Tesseract reads the rendered image straight from disk, with no PIL round trip
+    fd, path = tempfile.mkstemp(suffix=f".{image_format}", prefix="legal_indexer_")
     try:
-        img = Image.frombytes("RGB", [pix.width, pix.height], pix.samples)
-        return pytesseract.image_to_string(img)
+        with os.fdopen(fd, "wb") as f:
+            f.write(image)
+        return pytesseract.image_to_string(path)
     except Exception as e:
         print(f"Warning: OCR failed for a page: {e}")
         return ""
+    finally:
+        os.remove(path)
 
-def extract_text_from_pdf(pdf_path: str) -> Dict[int, str]:
-    """Extract text from PDF using PyMuPDF with OCR fallback."""
+def iter_pages_from_pdf(pdf_path: str, ocr_workers: int = 8, workers: int = 1,
+                        chunk_size: int = 16) -> Iterator[Tuple[int, str]]:
+    """Yield (page_num, text) for each page in order, using PyMuPDF with OCR fallback.
+
+    With workers > 1, page ranges of chunk_size pages are read in worker processes.
+    """
     if not os.path.exists(pdf_path):
         raise FileNotFoundError(f"PDF file not found: {pdf_path}")
-        
+
     try:
         doc = fitz.open(pdf_path)
-        pages = {}
-        for i in range(doc.page_count):
-            try:
-                text = doc[i].get_text()
-                if not text.strip():
-                    print(f"Page {i+1} has no text, attempting OCR.")
-                    pix = doc[i].get_pixmap()
-                    text = _ocr_page(pix)
-                pages[i + 1] = text
-            except Exception as e:
-                print(f"Warning: Error extracting page {i + 1}: {e}")
-                pages[i + 1] = ""
-        doc.close()
-        return pages
     except Exception as e:
-        print(f"PyMuPDF error: {e}. Falling back to PyPDF2.")
-        return _extract_with_pypdf2(pdf_path)
+        print(f"PyMuPDF error: {e}. Falling back to pypdfium2.")
+        yield from _iter_pages_with_pdfium(pdf_path)
+        return
 
-def _extract_with_pypdf2(pdf_path: str) -> Dict[int, str]:
-    """Fallback extraction using PyPDF2."""
-    pages = {}
     try:
-        with open(pdf_path, 'rb') as file:
-            reader = PyPDF2.PdfReader(file)
-            for i, page in enumerate(reader.pages):
-                try:
-                    pages[i + 1] = page.extract_text() or ""
-                except Exception as e:
-                    print(f"Warning: Error extracting page {i + 1}: {e}")
-                    pages[i + 1] = ""
+        if workers > 1 and doc.page_count > chunk_size:
+            # Compressed images are quicker to send back from the workers
+            image_format = "png"
+            pages = _read_pages_in_processes(pdf_path, doc.page_count, workers, chunk_size)
+        else:
+            # Uncompressed images are quickest to produce on this thread
+            image_format = "ppm"
+            pages = _read_pages(doc, 0, doc.page_count, image_format)
+
+        # PyMuPDF is not thread-safe, so pages are read on this thread or in
+        # worker processes. Only the OCR, which waits on an external
+        # tesseract process, is threaded.
+        with ThreadPoolExecutor(max_workers=ocr_workers) as executor:
+            pending = deque()  # (page_num, text or OCR job), in page order
+            for page_num, text, image in pages:
+                if image is not None:
+                    print(f"Page {page_num} has no text, attempting OCR.")
+                    text = executor.submit(_ocr_image, image, image_format)
+                pending.append((page_num, text))
+
+                # Hand pages on as soon as they are ready, waiting on OCR
+                # only once too many pages are queued behind it
+                while pending and (isinstance(pending[0][1], str) or pending[0][1].done()
+                                   or len(pending) > 2 * ocr_workers):
+                    yield _resolve_page(*pending.popleft())
+            while pending:
+                yield _resolve_page(*pending.popleft())
+    finally:
+        doc.close()
+
+def _read_pages(doc: fitz.Document, start: int, stop: int,
+                image_format: str) -> Iterator[Tuple[int, str, Optional[bytes]]]:
+    """Yield (page_num, text, image to OCR or None) for pages start..stop-1."""
+    for i in range(start, stop):
+        image = None
+        try:
+            page = doc[i]
+            text = page.get_text()
+            if not text or text.isspace():
+                image = _page_image(page, image_format)
+        except Exception as e:
+            print(f"Warning: Error extracting page {i + 1}: {e}")
+            text = ""
+        yield i + 1, text, image
+
+def _read_pages_in_processes(pdf_path: str, page_count: int, workers: int,
+                             chunk_size: int) -> Iterator[Tuple[int, str, Optional[bytes]]]:
+    """Read page ranges in worker processes, yielding pages in order."""
+    with ProcessPoolExecutor(max_workers=workers, mp_context=process_pool_context(),
+                             initializer=_init_extract_worker, initargs=(pdf_path,)) as executor:
+        futures = deque()
+        for start in range(0, page_count, chunk_size):
+            futures.append(executor.submit(_read_page_range, start, min(start + chunk_size, page_count)))
+            # Keep a bounded number of ranges in flight so pages stream out
+            if len(futures) >= 2 * workers:
+                yield from futures.popleft().result()
+        while futures:
+            yield from futures.popleft().result()
+
+def _resolve_page(page_num: int, text: Union[str, Future]) -> Tuple[int, str]:
+    return page_num, text if isinstance(text, str) else text.result()
+
+def extract_text_from_pdf(pdf_path: str, ocr_workers: int = 8, workers: int = 1) -> Dict[int, str]:
+    """Extract text from PDF using PyMuPDF with OCR fallback."""
+    return dict(iter_pages_from_pdf(pdf_path, ocr_workers=ocr_workers, workers=workers))
+
+def _iter_pages_with_pdfium(pdf_path: str) -> Iterator[Tuple[int, str]]:
+    """Fallback extraction using pypdfium2, one page at a time."""
+    # Imported on first use; most documents open with PyMuPDF
+    import pypdfium2 as pdfium
+
+    try:
+        pdf = pdfium.PdfDocument(pdf_path)
     except Exception as e:
-        print(f"Error reading PDF with PyPDF2: {e}")
-        return {}
-    return pages
+        print(f"Error reading PDF with pypdfium2: {e}")
+        return
+    try:
+        for i, page in enumerate(pdf):
+            try:
+                textpage = page.get_textpage()
+                try:
+                    # PDFium ends lines with CRLF; match PyMuPDF's output
+                    text = textpage.get_text_range().replace('\r\n', '\n')
+                finally:
+                    textpage.close()
+            except Exception as e:
+                print(f"Warning: Error extracting page {i + 1}: {e}")
+                text = ""
+            finally:
+                # Release the native page now rather than when it is collected
+                page.close()
+            yield i + 1, text
+    finally:
+        pdf.close()
+
+# Per-process document used by the page-reading worker pool
+_worker_doc = None
+
+def _init_extract_worker(pdf_path: str):
+    global _worker_doc
+    # PyMuPDF documents cannot be shared across processes; each worker opens its own
+    _worker_doc = fitz.open(pdf_path)
+
+def _read_page_range(start: int, stop: int) -> list:
+    return list(_read_pages(_worker_doc, start, stop, "png"))
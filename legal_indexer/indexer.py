@@ -1,80 +1,527 @@
+import itertools
 import re
-from collections import defaultdict
-from typing import Dict, List
-from legal_indexer.config import STATUTORY_PATTERNS, CASE_LAW_PATTERNS, GENERAL_PATTERNS, PHRASE_PATTERNS
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+from typing import Dict, Iterable, Iterator, List, Tuple
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick is optional; a trie-compressed regex is used instead
+    ahocorasick = None
+try:
+    import re2
+except ImportError:  # google-re2 is optional
+    re2 = None
+try:
+    import hyperscan
+except ImportError:  # hyperscan is optional
+    hyperscan = None
+try:
+    from re import _parser as _sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse as _sre_parse
+from legal_indexer.config import (STATUTORY_PATTERNS, CASE_LAW_PATTERNS, GENERAL_PATTERNS, PHRASE_PATTERNS,
+                                  PATTERN_ANCHORS)
+from legal_indexer.extractor import process_pool_context
+
+def _compile(pattern: str, ignore_case: bool = True):
+    """Compile a pattern, preferring RE2's linear-time engine."""
+    if re2 is not None:
+        options = re2.Options()
+        options.case_sensitive = not ignore_case
+        try:
+            return re2.compile(pattern, options)
+        except re2.error:
+            pass  # Syntax RE2 does not support; use the backtracking engine
+    return re.compile(pattern, re.IGNORECASE if ignore_case else 0)
+
+def _is_plain_char(c: str) -> bool:
+    # Neither numeric nor stripped as whitespace; case variants of such
+    # characters are never numeric either, so this holds under IGNORECASE
+    return not (c.isnumeric() or c.isspace())
+
+def _requires_plain_char(items) -> bool:
+    """Whether every match of the parsed items contains a _is_plain_char character."""
+    for op, av in items:
+        name = str(op)
+        if name == 'LITERAL':
+            if _is_plain_char(chr(av)):
+                return True
+        elif name == 'IN':
+            members = []
+            for member_op, value in av:
+                member = str(member_op)
+                if member == 'LITERAL':
+                    members.append(chr(value))
+                elif member == 'RANGE' and value[1] - value[0] < 1000:
+                    members.extend(map(chr, range(value[0], value[1] + 1)))
+                else:
+                    break  # Negated sets and categories such as \d may match digits
+            else:
+                if all(map(_is_plain_char, members)):
+                    return True
+        elif name == 'SUBPATTERN':
+            if _requires_plain_char(av[-1]):
+                return True
+        elif name == 'BRANCH':
+            if all(_requires_plain_char(branch) for branch in av[1]):
+                return True
+        elif name in ('MAX_REPEAT', 'MIN_REPEAT', 'POSSESSIVE_REPEAT'):
+            if av[0] >= 1 and _requires_plain_char(av[2]):
+                return True
+    return False
+
+def _may_be_numeric(pattern: str) -> bool:
+    """Whether a match of pattern, once stripped, can be all numeric.
+
+    Matches that cannot are never checked with isnumeric().
+    """
+    try:
+        return not _requires_plain_char(_sre_parse.parse(pattern))
+    except Exception:
+        return True  # Syntax the audit does not know; keep the check
+
+def _may_match(anchors, text_lower: str) -> bool:
+    # A plain substring search is far cheaper than running the regex over the page
+    return anchors is None or any(anchor in text_lower for anchor in anchors)
+
+class _PatternPass:
+    """One concept pattern, run as its own pass over the page."""
+
+    def __init__(self, category: str, pattern: str):
+        self.category = category
+        self.pattern = pattern
+        self.anchors = PATTERN_ANCHORS.get(pattern)
+        # Lowercasing a pattern would turn escapes such as \S into \s
+        self.lowerable = not re.search(r'\\[A-Z]', pattern)
+        self.numeric = _may_be_numeric(pattern)
+        self._regexes = {}
+
+    def regex(self, text_lower: str, lowered: bool, candidates=None):
+        """Return the pattern's regex if it can match this page, or None.
+
+        A lowered regex is case-sensitive and runs on the lowercased page;
+        otherwise it ignores case and runs on the original text. candidates,
+        when given, is the set of patterns the prefilter found on the page.
+        """
+        if candidates is None:
+            if not _may_match(self.anchors, text_lower):
+                return None
+        elif self.pattern not in candidates:
+            return None
+        regex = self._regexes.get(lowered)
+        if regex is None:
+            if lowered:
+                regex = _compile(self.pattern.lower(), ignore_case=False)
+            else:
+                regex = _compile(self.pattern)
+            self._regexes[lowered] = regex
+        return regex
+
+def _passes(family: Dict[str, List[str]]) -> List[_PatternPass]:
+    """One pass over the page per pattern of a family.
+
+    Patterns are never fused into one alternation: an alternation reports
+    only one of two overlapping matches, and case names and reporter
+    citations often overlap.
+    """
+    return [_PatternPass(category, pattern) for category, patterns in family.items() for pattern in patterns]
+
+# Patterns are compiled at import, and variants for each set of anchors on first use
+_STATUTORY_PASSES = _passes(STATUTORY_PATTERNS)
+_CASE_LAW_PASSES = _passes(CASE_LAW_PATTERNS)
+_GENERAL_PASSES = _passes({category: [pattern] for category, pattern in GENERAL_PATTERNS.items()})
+_ALL_PASSES = _STATUTORY_PASSES + _CASE_LAW_PASSES + _GENERAL_PASSES
+
+def _build_prefilter():
+    """Compile every concept pattern into one Hyperscan database.
+
+    The database only answers which patterns can match a page; the matches
+    themselves still come from the passes above, so results are unchanged.
+    Returns () when a pattern cannot be compiled.
+    """
+    patterns = list(dict.fromkeys(pattern_pass.pattern for pattern_pass in _ALL_PASSES))
+    # PREFILTER may report extra patterns but never misses one
+    flags = (hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_PREFILTER
+             | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP)
+    database = hyperscan.Database()
+    try:
+        database.compile(expressions=[pattern.encode() for pattern in patterns], ids=list(range(len(patterns))),
+                         elements=len(patterns), flags=[flags] * len(patterns))
+    except hyperscan.error:
+        return ()  # A pattern Hyperscan cannot handle; use the anchors instead
+    return database, patterns
+
+# Built on first use: compiling takes a good part of a second, which only pays
+# off once pages are actually scanned
+_PREFILTER = None
+
+def _prefilter_candidates(text_lower: str):
+    """Return the set of concept patterns that can match the page, or None without Hyperscan."""
+    global _PREFILTER
+    if hyperscan is None:
+        return None
+    if _PREFILTER is None:
+        _PREFILTER = _build_prefilter()
+    if not _PREFILTER:
+        return None
+    database, patterns = _PREFILTER
+    candidates = set()
+
+    def on_match(pattern_id, start, end, flags, context):
+        candidates.add(patterns[pattern_id])
+
+    database.scan(text_lower.encode(), match_event_handler=on_match)
+    return candidates
+
+def _is_word_char(c: str) -> bool:
+    return c.isalnum() or c == '_'
+
+def _at_word_boundary(text: str, i: int) -> bool:
+    """Equivalent of a \\b assertion at position i."""
+    before = i > 0 and _is_word_char(text[i - 1])
+    after = i < len(text) and _is_word_char(text[i])
+    return before != after
+
+def _phrase_literals(pattern: str):
+    """Return the phrases of a \\b(?:...|...)\\b pattern of plain literals, or None."""
+    match = re.fullmatch(r'\\b\(\?:(.*)\)\\b', pattern)
+    if not match:
+        return None
+    phrases = [re.sub(r'\\(\W)', r'\1', alternative) for alternative in match.group(1).split('|')]
+    if not all(phrases) or any(c in phrase for phrase in phrases for c in '\\.^$*+?{}[]()|'):
+        return None
+    return phrases
+
+def _build_phrase_matcher():
+    """Put every literal phrase pattern into one automaton; compile the rest."""
+    owners = {}  # phrase -> [(pattern index, alternative index)]
+    regexes = []
+    for i, pattern in enumerate(PHRASE_PATTERNS):
+        phrases = _phrase_literals(pattern) if ahocorasick is not None else None
+        if phrases is None:
+            # Phrase patterns are all lowercase and run against the lowercased page
+            regexes.append((i, _compile(pattern, ignore_case=False)))
+            continue
+        for j, phrase in enumerate(phrases):
+            owners.setdefault(phrase, []).append((i, j))
+    if not owners:
+        return None, regexes
+
+    automaton = ahocorasick.Automaton()
+    for phrase, phrase_owners in owners.items():
+        automaton.add_word(phrase, (len(phrase), phrase.title(), phrase_owners))
+    automaton.make_automaton()
+    return automaton, regexes
+
+_PHRASE_AUTOMATON, _PHRASE_RES = _build_phrase_matcher()
+# Only matches of these phrase patterns need an isnumeric() check
+_NUMERIC_PHRASES = frozenset(i for i, pattern in enumerate(PHRASE_PATTERNS) if _may_be_numeric(pattern))
+
+def _trie_regex(words: Iterable[str]) -> str:
+    """Build a compact alternation from a character trie of words.
+
+    Shared prefixes are factored out (e.g. "motion", "motion to dismiss"
+    becomes "motion(?:\\ to\\ dismiss)?"), so the engine decides every word in
+    one pass instead of trying each alternative from scratch.
+    """
+    trie = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[''] = {}
+
+    def _pattern(node: dict) -> str:
+        alternatives = [re.escape(char) + _pattern(child) for char, child in sorted(node.items()) if char]
+        if not alternatives:
+            return ''
+        pattern = alternatives[0] if len(alternatives) == 1 else '(?:' + '|'.join(alternatives) + ')'
+        if '' in node:
+            # A word ends here but longer ones continue; prefer the longer match
+            pattern = ('(?:' + pattern + ')' if len(alternatives) == 1 else pattern) + '?'
+        return pattern
+
+    return _pattern(trie)
+
+def _batched(items: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def _snippet(text: str, match_start: int, match_end: int) -> str:
+    """Return the context surrounding a match."""
+    context_window = 100
+    start = max(0, match_start - context_window)
+    end = min(len(text), match_end + context_window)
+    return text[start:end].strip().replace('\n', ' ')
+
+def _merge_hits(all_entries: dict, arrival: Iterator[int], hits: List[Tuple[str, str, str]], page_num: int,
+                headings: tuple) -> bool:
+    """Add a page's hits to the entry store, as _add_to_index does; return whether any was new."""
+    intern = sys.intern
+    added = False
+    for term, category, snippet in hits:
+        # The same term recurs on many pages; share one string per term
+        key = (intern(term), intern(category))
+        entries = all_entries.get(key)
+        if entries is None:
+            entries = all_entries[key] = {}
+        entry = (page_num, snippet, headings)
+        if entry not in entries:
+            entries[entry] = next(arrival)
+            added = True
+    return added
+
+try:
+    from legal_indexer._fast import merge_hits as _merge_hits
+except ImportError:  # The compiled loop is optional; it is built when Cython is installed
+    pass
 
 class LegalIndexer:
-    def __init__(self, legal_terms: Dict[str, List[str]], page_offset: int = 0, terms_only: bool = False):
+    def __init__(self, legal_terms: Dict[str, List[str]], page_offset: int = 0, terms_only: bool = False,
+                 keep_context: bool = True):
         self.legal_terms = legal_terms
-        self.index = defaultdict(lambda: defaultdict(list))
-        self.cross_references = defaultdict(set)
+        # Entries are stored flat, keyed by (term, category); see the index property
+        self._entries = {}
+        self._arrival = itertools.count()
+        self._index = None
+        self.cross_references = {}
         self.page_offset = page_offset
         self.terms_only = terms_only
-        self.current_headings = [None] * 5
+        # Without it, entries get an empty snippet; only some outputs show them
+        self.keep_context = keep_context
+        self.current_headings = (None,) * 5
+        # The last page lowercased, shared by the scans of that page
+        self._lowered = (None, None)
+        self._terms_matcher = self._build_terms_matcher(legal_terms)
+
+    @staticmethod
+    def _build_terms_matcher(legal_terms: Dict[str, List[str]]):
+        """Build a single matcher over all predefined terms."""
+        # The same term may be listed under several categories
+        terms = {}
+        for category, category_terms in legal_terms.items():
+            for term in category_terms:
+                terms.setdefault(term.lower(), []).append((category, term.title()))
+        if not terms:
+            return None
+
+        if ahocorasick is None:
+            # Lookahead so terms starting inside a longer match are still found
+            return re.compile(rf'(?=\b({_trie_regex(terms)})\b)'), terms
+
+        automaton = ahocorasick.Automaton()
+        for key, meta in terms.items():
+            # Most terms begin and end with a word character, which makes
+            # their boundary check a single look at each neighbour
+            word_edges = _is_word_char(key[0]) and _is_word_char(key[-1])
+            automaton.add_word(key, (len(key), meta, word_edges))
+        automaton.make_automaton()
+        return automaton, terms
+
+    def _iter_term_matches(self, text_lower: str) -> Iterator[Tuple[int, int, List[Tuple[str, str]]]]:
+        """Yield (start, end, [(category, formatted_term)]) for every predefined term."""
+        if self._terms_matcher is None:
+            return
+        matcher, terms = self._terms_matcher
+
+        if isinstance(matcher, re.Pattern):
+            for match in matcher.finditer(text_lower):
+                start, longest = match.start(), match.group(1)
+                # The regex reports the longest term at each position; shorter
+                # terms that are prefixes of it are recovered here
+                for i in range(1, len(longest)):
+                    if longest[:i] in terms and _at_word_boundary(longest, i):
+                        yield start, start + i, terms[longest[:i]]
+                yield start, start + len(longest), terms[longest]
+            return
+
+        last = len(text_lower) - 1
+        for end, (length, meta, word_edges) in matcher.iter(text_lower):
+            start = end - length + 1
+            if word_edges:
+                if (start and _is_word_char(text_lower[start - 1])) or (end < last and _is_word_char(text_lower[end + 1])):
+                    continue
+            elif not (_at_word_boundary(text_lower, start) and _at_word_boundary(text_lower, end + 1)):
+                continue
+            yield start, end + 1, meta
 
-    def set_current_headings(self, headings: List[str]):
-        self.current_headings = headings
+    @property
+    def index(self) -> Dict[str, Dict[str, list]]:
+        """Nested {term: {category: entries}} view of the indexed entries.
 
-    def _add_to_index(self, term: str, category: str, page_num: int, match: re.Match, text: str):
+        all_references is derived here: every distinct entry of the term once,
+        in the order it was first indexed.
+        """
+        if self._index is None:
+            grouped = {}
+            for (term, category), entries in self._entries.items():
+                grouped.setdefault(term, []).append((category, entries))
+            index = {}
+            for term, categories in grouped.items():
+                if len(categories) == 1:
+                    all_references = list(categories[0][1])
+                else:
+                    arrivals = sorted(itertools.chain.from_iterable(entries.items() for _, entries in categories),
+                                      key=itemgetter(1))
+                    all_references = list(dict.fromkeys(entry for entry, _ in arrivals))
+                # all_references follows the term's first category, as when it was stored
+                view = index[term] = {categories[0][0]: list(categories[0][1]), 'all_references': all_references}
+                for category, entries in categories[1:]:
+                    view[category] = list(entries)
+            self._index = index
+        return self._index
+
+    def set_current_headings(self, headings: Iterable[str]):
+        # Held as a tuple so every entry under these headings shares it
+        self.current_headings = tuple(headings)
+
+    def _add_to_index(self, term: str, category: str, page_num: int, snippet: str):
         """Add a term to the index with context."""
-        context_window = 100
-        start = max(0, match.start() - context_window)
-        end = min(len(text), match.end() + context_window)
-        snippet = text[start:end].strip().replace('\n', ' ')
-        
-        entry = (page_num, snippet, self.current_headings.copy())
-        
+        entry = (page_num, snippet, self.current_headings)
+
+        # Each category keeps its entries as a set, remembering when each arrived
+        entries = self._entries.get((term, category))
+        if entries is None:
+            entries = self._entries[(term, category)] = {}
         # Avoid duplicate entries for the same page and context
-        if entry not in self.index[term][category]:
-            self.index[term][category].append(entry)
-        if entry not in self.index[term]['all_references']:
-            self.index[term]['all_references'].append(entry)
+        if entry not in entries:
+            entries[entry] = next(self._arrival)
+            self._index = None
+
+    def add_hits(self, page_num: int, hits: List[Tuple[str, str, str]]):
+        """Index the (term, category, snippet) hits found on a page."""
+        if not hits:
+            return
+        if _merge_hits(self._entries, self._arrival, hits, page_num - self.page_offset, self.current_headings):
+            self._index = None
+
+    def _snippet(self, text: str, start: int, end: int) -> str:
+        return _snippet(text, start, end) if self.keep_context else ''
+
+    def _scan_passes(self, passes: List[_PatternPass], text: str, text_lower: str,
+                     hits: List[Tuple[str, str, str]], candidates=None):
+        """Append the pattern matches of each pass to hits."""
+        # Offsets into the lowercased page only carry over when lowering kept its length
+        same_length = len(text_lower) == len(text)
+        append = hits.append
+        snippet = self._snippet
+        for pattern_pass in passes:
+            lowered = same_length and pattern_pass.lowerable
+            regex = pattern_pass.regex(text_lower, lowered, candidates)
+            if regex is None:
+                continue
+            category, numeric = pattern_pass.category, pattern_pass.numeric
+            for match in regex.finditer(text_lower if lowered else text):
+                start, end = match.span()
+                term = text[start:end].strip()
+                if not (numeric and term.isnumeric()):
+                    append((term, category, snippet(text, start, end)))
+
+    def _scan_concepts(self, text: str, text_lower: str) -> List[Tuple[str, str, str]]:
+        """Find legal concepts on a page without modifying the index."""
+        hits = []
+        candidates = _prefilter_candidates(text_lower)
+
+        # Statutory, case-law and general patterns in one run of passes
+        self._scan_passes(_GENERAL_PASSES if self.terms_only else _ALL_PASSES, text, text_lower, hits, candidates)
+
+        # Index predefined legal terms in a single pass over the page
+        for start, end, meta in self._iter_term_matches(text_lower):
+            snippet = self._snippet(text, start, end)
+            for category, formatted_term in meta:
+                hits.append((formatted_term, category, snippet))
+
+        return hits
+
+    def _scan_phrases(self, text: str, text_lower: str) -> List[Tuple[str, str, str]]:
+        """Find key phrases on a page without modifying the index."""
+        found = []  # (pattern index, start, end, phrase)
+        for i, pattern in _PHRASE_RES:
+            for match in pattern.finditer(text_lower):
+                found.append((i, match.start(), match.end(), match.group().title()))
+
+        if _PHRASE_AUTOMATON is not None:
+            # Match every phrase in one pass, then keep what each pattern's
+            # finditer would: at each start the first alternative that fits,
+            # and no match overlapping the previous one
+            first = {}
+            for end, (length, phrase, owners) in _PHRASE_AUTOMATON.iter(text_lower):
+                start, end = end - length + 1, end + 1
+                if not (_at_word_boundary(text_lower, start) and _at_word_boundary(text_lower, end)):
+                    continue
+                for i, alternative in owners:
+                    best = first.get((i, start))
+                    if best is None or alternative < best[0]:
+                        first[(i, start)] = (alternative, end, phrase)
+            last = None, 0
+            for (i, start), (_, end, phrase) in sorted(first.items()):
+                if last[0] == i and start < last[1]:
+                    continue
+                found.append((i, start, end, phrase))
+                last = i, end
+            found.sort(key=lambda hit: hit[:2])
+
+        return [(phrase, 'key_phrases', self._snippet(text, start, end))
+                for i, start, end, phrase in found if not (i in _NUMERIC_PHRASES and phrase.isnumeric())]
+
+    def scan_page(self, text: str) -> List[Tuple[str, str, str]]:
+        """Find every concept and key phrase on a page."""
+        text_lower = self._lower(text)
+        hits = self._scan_concepts(text, text_lower) + self._scan_phrases(text, text_lower)
+        # Repeated hits on a page would be rejected by the index anyway
+        return list(dict.fromkeys(hits))
+
+    def _scan_batch(self, batch: List[Tuple[int, str]]) -> List[Tuple[int, List[Tuple[str, str, str]]]]:
+        return [(page_num, self.scan_page(text) if text and not text.isspace() else []) for page_num, text in batch]
+
+    def scan_pages(self, pages: Iterable[Tuple[int, str]], workers: int = 1,
+                   batch_size: int = 8) -> Iterator[Tuple[int, List[Tuple[str, str, str]]]]:
+        """Yield (page_num, hits) for each page, in order, using worker processes when workers > 1."""
+        batches = _batched(pages, batch_size)
+        if workers <= 1:
+            for batch in batches:
+                yield from self._scan_batch(batch)
+            return
+
+        # A document that fits in one batch is not worth starting workers for
+        first = next(batches, None)
+        second = next(batches, None)
+        if second is None:
+            yield from self._scan_batch(first or [])
+            return
+
+        with ProcessPoolExecutor(max_workers=workers, mp_context=process_pool_context(), initializer=_init_scan_worker,
+                                 initargs=(self.legal_terms, self.terms_only, self.keep_context)) as executor:
+            # Keep a bounded number of batches in flight so pages stream through
+            pending = deque()
+            for batch in itertools.chain([first, second], batches):
+                pending.append(executor.submit(_scan_batch, batch))
+                if len(pending) > 2 * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+    def _lower(self, text: str) -> str:
+        """Lowercase a page, reusing the result when the same page is passed again."""
+        if self._lowered[0] is not text:
+            self._lowered = (text, text.lower())
+        return self._lowered[1]
 
     def identify_legal_concepts(self, text: str, page_num: int):
         """Identify and index legal concepts with improved accuracy."""
-        page_num -= self.page_offset
-
-        if not self.terms_only:
-            # Process statutory patterns
-            for category, patterns in STATUTORY_PATTERns.items():
-                for pattern in patterns:
-                    for match in re.finditer(pattern, text, re.IGNORECASE):
-                        term = match.group().strip()
-                        if not term.isnumeric():
-                            self._add_to_index(term, category, page_num, match, text)
-
-            # Process case law patterns
-            for category, patterns in CASE_LAW_PATTERNS.items():
-                for pattern in patterns:
-                    for match in re.finditer(pattern, text, re.IGNORECASE):
-                        term = match.group().strip()
-                        if not term.isnumeric():
-                            self._add_to_index(term, category, page_num, match, text)
-
-        # Process general patterns
-        for category, pattern in GENERAL_PATTERNS.items():
-            for match in re.finditer(pattern, text, re.IGNORECASE):
-                term = match.group().strip()
-                if not term.isnumeric():
-                    self._add_to_index(term, category, page_num, match, text)
-
-        # Index predefined legal terms
-        text_lower = text.lower()
-        for category, terms in self.legal_terms.items():
-            for term in terms:
-                pattern = rf'\b{re.escape(term.lower())}\b'
-                for match in re.finditer(pattern, text_lower, re.IGNORECASE):
-                    formatted_term = term.title()
-                    self._add_to_index(formatted_term, category, page_num, match, text)
+        self.add_hits(page_num, self._scan_concepts(text, self._lower(text)))
 
     def extract_key_phrases(self, text: str, page_num: int):
         """Extract important legal phrases."""
-        page_num -= self.page_offset
-        for pattern in PHRASE_PATTERNS:
-            for match in re.finditer(pattern, text, re.IGNORECASE):
-                phrase = match.group().title()
-                if not phrase.isnumeric():
-                    self._add_to_index(phrase, 'key_phrases', page_num, match, text)
+        self.add_hits(page_num, self._scan_phrases(text, self._lower(text)))
 
     def build_cross_references(self):
         """Build cross-references between related terms."""
@@ -85,9 +532,19 @@ class LegalIndexer:
             'Statute Of Limitations': ['Limitations Period', 'Time Limitation']
         }
         
+        terms = frozenset(self.index)
         for main_term, alternatives in synonyms.items():
-            if main_term in self.index:
-                for alt in alternatives:
-                    if alt in self.index:
-                        self.cross_references[main_term].add(alt)
+            if main_term in terms:
+                found = terms.intersection(alternatives)
+                if found:
+                    self.cross_references.setdefault(main_term, set()).update(found)
+
+# Per-process indexer used by scan_pages' worker pool
+_worker_indexer = None
+
+def _init_scan_worker(legal_terms: Dict[str, List[str]], terms_only: bool, keep_context: bool):
+    global _worker_indexer
+    _worker_indexer = LegalIndexer(legal_terms=legal_terms, terms_only=terms_only, keep_context=keep_context)
 
+def _scan_batch(batch: List[Tuple[int, str]]) -> List[Tuple[int, List[Tuple[str, str, str]]]]:
+    return _worker_indexer._scan_batch(batch)
@@ -10,56 +10,77 @@ import argparse
 import sys
 import json
 import os
-from legal_indexer.extractor import extract_text_from_pdf
+from legal_indexer.extractor import iter_pages_from_pdf
 from legal_indexer.indexer import LegalIndexer
-from legal_indexer.utils import save_output, get_statistics, get_table_of_contents
+from legal_indexer.utils import save_outputs, get_statistics, get_table_of_contents
 
 class LegalIndexGenerator:
-    def __init__(self, legal_terms: dict, page_offset: int = 0, terms_only: bool = False):
-        self.indexer = LegalIndexer(legal_terms=legal_terms, page_offset=page_offset, terms_only=terms_only)
-        self.page_content = {}
+    def __init__(self, legal_terms: dict, page_offset: int = 0, terms_only: bool = False, workers: int = 1,
+                 keep_context: bool = True):
+        self.indexer = LegalIndexer(legal_terms=legal_terms, page_offset=page_offset, terms_only=terms_only,
+                                    keep_context=keep_context)
+        self.total_pages = 0
+        self.pages_with_content = 0
         self.toc = {}
+        self._headings_by_page = {}
+        self.workers = workers
 
     def process_document(self, pdf_path: str):
         """Main processing function with progress indication."""
         print(f"Processing document: {pdf_path}")
         
-        self.toc = get_table_of_contents(pdf_path, self.indexer.page_offset)
-        self.page_content = extract_text_from_pdf(pdf_path)
-        total_pages = len(self.page_content)
-        
-        if total_pages == 0:
-            print("Error: No pages extracted from PDF")
-            return
-            
-        print(f"Extracted text from {total_pages} pages")
+        self.toc = get_table_of_contents(pdf_path, self.indexer.page_offset, workers=self.workers)
+        self._headings_by_page = self._map_headings_to_pages(self.toc)
+        self.total_pages = 0
+        self.pages_with_content = 0
+
+        # Pages stream from the extractor through the (parallel) scanner in page order
+        pages = iter_pages_from_pdf(pdf_path, workers=self.workers)
+        page_hits = self.indexer.scan_pages(self._count_pages(pages), workers=self.workers)
         
         # Process pages with progress indication
-        current_headings = [None] * 5
-        for i, (page_num, text) in enumerate(self.page_content.items(), 1):
-            if i % 10 == 0 or i == total_pages:
-                print(f"Processing page {i}/{total_pages}...")
+        current_headings = (None,) * 5
+        for i, (page_num, hits) in enumerate(page_hits, 1):
+            if i % 10 == 0:
+                print(f"Processing page {i}...")
             
             # This is a simplified heading update. A more robust solution would analyze font changes.
-            for l1, l2_dict in self.toc.items():
-                for l2, l3_dict in l2_dict.items():
-                    for l3, l4_val in l3_dict.items():
-                        if isinstance(l4_val, dict):
-                            if list(l4_val.values())[0] == page_num:
-                                current_headings = [l1, l2, l3, None, None]
-                        elif l4_val == page_num:
-                            current_headings = [l1, l2, l3, None, None]
-
-
+            current_headings = self._headings_by_page.get(page_num, current_headings)
             self.indexer.set_current_headings(current_headings)
 
-            if text.strip():
-                self.indexer.identify_legal_concepts(text, page_num)
-                self.indexer.extract_key_phrases(text, page_num)
+            if hits:
+                self.indexer.add_hits(page_num, hits)
+
+        if self.total_pages == 0:
+            print("Error: No pages extracted from PDF")
+            return
+            
+        print(f"Extracted text from {self.total_pages} pages")
         
         self.indexer.build_cross_references()
         print(f"Identified {len(self.indexer.index)} unique legal concepts and terms")
 
+    @staticmethod
+    def _map_headings_to_pages(toc: dict) -> dict:
+        """Map each TOC page number to the headings that start on it."""
+        # Walked in TOC order, so a later heading on the same page wins
+        headings_by_page = {}
+        for l1, l2_dict in toc.items():
+            for l2, l3_dict in l2_dict.items():
+                for l3, l4_val in l3_dict.items():
+                    if isinstance(l4_val, dict):
+                        l4_val = next(iter(l4_val.values()), None)
+                    headings_by_page[l4_val] = (l1, l2, l3, None, None)
+        return headings_by_page
+
+    def _count_pages(self, pages):
+        """Pass pages through, counting them for the statistics."""
+        for page_num, text in pages:
+            self.total_pages += 1
+            if text and not text.isspace():
+                self.pages_with_content += 1
+            yield page_num, text
+
 def load_legal_terms(custom_terms_file: str = None) -> dict:
     """Load legal terms from a JSON file."""
     if custom_terms_file and os.path.exists(custom_terms_file):
@@ -85,18 +106,20 @@ Examples:
   python -m legal_indexer.main document.pdf
   python -m legal_indexer.main document.pdf -o my_index.pdf
   python -m legal_indexer.main document.pdf --format json -o index.json
+  python -m legal_indexer.main document.pdf -o index.txt -o index.json -o index.docx
   python -m legal_indexer.main document.pdf --no-subcategories
   python -m legal_indexer.main document.pdf --terms-only
   python -m legal_indexer.main document.pdf --custom-terms my_terms.json
   python -m legal_indexer.main document.pdf --columns 2
   python -m legal_indexer.main document.pdf --suppress-categories subdivisions
   python -m legal_indexer.main document.pdf --context-style headings
+  python -m legal_indexer.main document.pdf --workers 4
         """
     )
     
     parser.add_argument('input_pdf', help='Path to input PDF file')
-    parser.add_argument('-o', '--output', default='legal_index.txt',
-                       help='Output file path (default: legal_index.txt)')
+    parser.add_argument('-o', '--output', action='append',
+                       help='Output file path (default: legal_index.txt); repeat to write several formats at once')
     parser.add_argument('-f', '--format', choices=['text', 'json', 'pdf', 'docx', 'csv', 'xml', 'md'],
                        help='Output format (default: auto-detect from output file extension)')
     parser.add_argument('--no-subcategories', action='store_true',
@@ -111,6 +134,7 @@ Examples:
     parser.add_argument('--columns', type=int, default=1, help='Number of columns for DOCX output')
     parser.add_argument('--suppress-categories', nargs='+', help='List of categories to suppress from the output')
     parser.add_argument('--context-style', choices=['none', 'snippet', 'headings'], default='none', help='Style of context to display for each term.')
+    parser.add_argument('--workers', type=int, default=1, help='Number of processes used to read, scan and outline pages (default: 1, no worker processes)')
     
     args = parser.parse_args()
     
@@ -118,30 +142,36 @@ Examples:
         # Load legal terms
         legal_terms = load_legal_terms(args.custom_terms)
 
-        # Determine output format
-        output_format = args.format
-        if not output_format:
-            ext = args.output.split('.')[-1].lower()
-            if ext in ['json', 'pdf', 'docx', 'csv', 'xml', 'md']:
-                output_format = ext
-            else:
-                output_format = 'text'
+        # Determine the format of each output
+        outputs = {}
+        for output in args.output or ['legal_index.txt']:
+            output_format = args.format
+            if not output_format:
+                ext = output.split('.')[-1].lower()
+                if ext in ['json', 'pdf', 'docx', 'csv', 'xml', 'md']:
+                    output_format = ext
+                else:
+                    output_format = 'text'
+            outputs[output] = output_format
 
         # Create and run the generator
         generator = LegalIndexGenerator(
             legal_terms=legal_terms,
             page_offset=args.page_offset, 
-            terms_only=args.terms_only
+            terms_only=args.terms_only,
+            workers=args.workers,
+            # Snippets only appear in these outputs, so skip building them otherwise.
+            # The headings style lists one line per entry, and entries differ by snippet.
+            keep_context=args.context_style != 'none' or any(f in ('json', 'csv', 'xml') for f in outputs.values())
         )
         generator.process_document(args.input_pdf)
         
         # Save output
-        save_output(
-            args.output, 
+        save_outputs(
+            outputs,
             generator.indexer.index,
             generator.indexer.cross_references,
             generator.toc,
-            format=output_format, 
             include_subcategories=not args.no_subcategories,
             terms_only=args.terms_only,
             columns=args.columns,
@@ -151,7 +181,7 @@ Examples:
         
         # Print statistics if requested
         if args.stats:
-            stats = get_statistics(generator.indexer.index, generator.page_content)
+            stats = get_statistics(generator.indexer.index, generator.total_pages, generator.pages_with_content)
             print("\nIndexing Statistics:")
             print(f"Total terms indexed: {stats['total_terms']}")
             print(f"Total pages: {stats['total_pages']}")
@@ -1,436 +1,870 @@
 
-import json
-from collections import defaultdict
-from typing import Dict, List
-import csv
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from operator import itemgetter
+from typing import Dict, Iterator, List, Optional
+from xml.sax.saxutils import escape as xml_escape
+import importlib.util
+import io
+import itertools
+import os
+import stat
+import tempfile
+import threading
+import zipfile
 import fitz  # PyMuPDF
-from docx import Document
-from docx.shared import Inches
-from docx.oxml.section import CT_SectPr
-from docx.oxml.text.paragraph import CT_P
-from docx.oxml.table import CT_Tbl
+import json
+try:
+    import orjson
+except ImportError:  # orjson is much faster, but the standard library can write the same JSON
+    orjson = None
 from lxml import etree
 import re
-
-def get_table_of_contents(pdf_path: str, page_offset: int) -> Dict:
-    """Extract a table of contents from the PDF based on font size."""
+from legal_indexer.extractor import process_pool_context
+
+# to_pdf writes each page's text operators through Shape.text_cont, which is
+# not public API. It is only used on the PyMuPDF release setup.py pins; on any
+# other release the same rows are laid out with insert_textbox instead.
+_PDF_DIRECT_TEXT = getattr(fitz, 'VersionBind', '').split('.')[:2] == ['1', '23']
+
+# Statutory references stripped from headings
+_HEADING_SECTION_RE = re.compile(r'§\s*\d+(\.\d+)?')
+# The "dict" defaults without image blocks, which headings never come from
+_HEADING_TEXT_FLAGS = fitz.TEXTFLAGS_DICT & ~fitz.TEXT_PRESERVE_IMAGES
+
+_DOCX_BREAKS_RE = re.compile(r'([\t\n\r])')
+# Characters XML text cannot hold, such as form feeds from extracted PDF text
+_XML_INVALID_RE = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f\ud800-\udfff\ufffe\uffff]')
+
+# str() of each page number, grown as larger pages are seen; indexing
+# this is several times faster than converting the same ints again.
+# save_outputs formats pages from several threads, so growth is locked;
+# existing entries never change, so lookups need no lock.
+_PAGE_STRS: List[str] = []
+_PAGE_STRS_LOCK = threading.Lock()
+
+def _pages_to_str(pages: tuple) -> str:
+    """Join sorted page numbers for display, as in "1, 2, 5"."""
+    if not pages or pages[0] < 0:  # a page offset can number front matter below zero
+        return ', '.join(map(str, pages))
+    if pages[-1] >= len(_PAGE_STRS):
+        with _PAGE_STRS_LOCK:
+            # Another thread may have grown the table while this one waited
+            if pages[-1] >= len(_PAGE_STRS):
+                _PAGE_STRS.extend(map(str, range(len(_PAGE_STRS), pages[-1] + 1)))
+    return ', '.join(map(_PAGE_STRS.__getitem__, pages))
+
+try:
+    from legal_indexer._fast import format_pages as _pages_to_str
+except ImportError:  # The compiled version is optional; it is built when Cython is installed
+    pass
+
+_PDF_UNENCODABLE_RE = re.compile('[^\x00-\xff]')
+
+def _wrap_pdf_line(line: str, font, fontsize: float, width: float, word_lengths: Dict[str, float]) -> List[str]:
+    """Split a line into the rows page.insert_textbox would wrap it to.
+
+    word_lengths memoises measured words across calls; index text repeats them a lot.
+    """
+    text_length = font.text_length
+    line = line.expandtabs(1)
+    if text_length(line, fontsize=fontsize) <= width:
+        return [line.rstrip()]
+    space = text_length(" ", fontsize=fontsize)
+    rows = []
+    row, rest = "", width
+    for word in line.split(" "):
+        word_length = word_lengths.get(word)
+        if word_length is None:
+            word_length = word_lengths[word] = text_length(word, fontsize=fontsize)
+        if rest >= word_length:
+            row += word + " "
+            rest -= word_length + space
+            continue
+        if row:
+            rows.append(row.rstrip())
+        if word_length <= width:
+            row = word + " "
+            rest = width - word_length - space
+            continue
+        # a word wider than the box is broken between characters
+        row = ""
+        for c in word:
+            if text_length(row, fontsize=fontsize) <= width - text_length(c, fontsize=fontsize):
+                row += c
+            else:
+                rows.append(row)
+                row = c
+        row += " "
+        rest = width - text_length(row, fontsize=fontsize)
+    rows.append(row.rstrip())
+    return rows
+
+_CSV_NEEDS_QUOTING = re.compile(r'[",\r\n]').search
+
+def _csv_field(value: str) -> str:
+    """Quote a CSV field the way csv.writer does by default."""
+    if _CSV_NEEDS_QUOTING(value):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+def _docx_paragraph_xml(text: str, style_id: str = None) -> str:
+    """Serialize a w:p for text, with runs as python-docx's add_run writes them."""
+    # Dropped rather than failing the whole document, as add_paragraph would
+    text = _XML_INVALID_RE.sub('', text)
+    parts = ['<w:p>']
+    if style_id is not None:
+        parts.append(f'<w:pPr><w:pStyle w:val="{style_id}"/></w:pPr>')
+    if text:
+        parts.append('<w:r>')
+        for piece in _DOCX_BREAKS_RE.split(text):
+            if piece == '\t':
+                parts.append('<w:tab/>')
+            elif piece in ('\n', '\r'):
+                parts.append('<w:br/>')
+            elif piece:
+                space = ' xml:space="preserve"' if len(piece.strip()) < len(piece) else ''
+                parts.append(f'<w:t{space}>{xml_escape(piece)}</w:t>')
+        parts.append('</w:r>')
+    parts.append('</w:p>')
+    return ''.join(parts)
+
+_W_NS = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+# Style ids of the styles used, as defined in python-docx's blank document;
+# Normal is the default paragraph style and is not named on a paragraph
+_DOCX_STYLE_IDS = {'Title': 'Title', 'Heading 1': 'Heading1', 'Heading 2': 'Heading2',
+                   'Heading 3': 'Heading3', 'Heading 4': 'Heading4'}
+
+def _docx_template() -> Optional[str]:
+    """Locate python-docx's blank document without importing the package."""
+    spec = importlib.util.find_spec('docx')
+    if spec is None or spec.origin is None:
+        return None
+    path = os.path.join(os.path.dirname(spec.origin), 'templates', 'default.docx')
+    return path if os.path.exists(path) else None
+
+def _page_headings(page) -> List[tuple]:
+    """Classify a page's text spans as (level, text) heading candidates, in reading order.
+
+    Level 1 is ALL CAPS in a bold/heavy font, 2 is Title Case in a bold/heavy
+    font, 3 is Title Case in a regular font and 4 is anything else.
+    """
+    headings = []
+    for block in page.get_text("dict", flags=_HEADING_TEXT_FLAGS)["blocks"]:
+        for line in block.get("lines", ()):
+            for span in line.get("spans", ()):
+                text = span["text"].strip()
+                if not text or text.isnumeric():
+                    continue
+                # Clean statutory references from headings; most spans have none
+                if '§' in text:
+                    text = _HEADING_SECTION_RE.sub('', text).strip()
+                font = span["font"].lower()
+                if "bold" in font or "heavy" in font:
+                    if text.isupper() or not any(map(str.isalpha, text)):
+                        headings.append((1, text))
+                    elif text.istitle():
+                        headings.append((2, text))
+                elif text.istitle():
+                    headings.append((3, text))
+                else:
+                    headings.append((4, text))
+    return headings
+
+def get_table_of_contents(pdf_path: str, page_offset: int, workers: int = 1, chunk_size: int = 32) -> Dict:
+    """Extract a table of contents from the PDF based on font size.
+
+    With workers > 1, the spans of page ranges of chunk_size pages are
+    classified in worker processes; the outline is still built in page order.
+    """
     doc = fitz.open(pdf_path)
+    if workers > 1 and doc.page_count > chunk_size:
+        page_headings = _iter_page_headings_in_processes(pdf_path, doc.page_count, workers, chunk_size)
+    else:
+        page_headings = map(_page_headings, doc)
     toc = {}
     current_headings = [None, None, None, None]
 
-    for page_num, page in enumerate(doc):
-        blocks = page.get_text("dict")
-        for block in blocks["blocks"]:
-            if "lines" in block:
-                for line in block["lines"]:
-                    if "spans" in line:
-                        for span in line["spans"]:
-                            font_size = round(span["size"])
-                            text = span["text"].strip()
-                            if text and not text.isnumeric():
-                                # Clean statutory references from headings
-                                text = re.sub(r'§\s*\d+(\.\d+)?', '', text).strip()
-                                
-                                # Level 1: ALL CAPS, bold/heavy font
-                                if span["font"].lower().find("bold") > -1 or span["font"].lower().find("heavy") > -1:
-                                    if all(c.isupper() or not c.isalpha() for c in text):
-                                        current_headings[0] = text
-                                        current_headings[1] = None
-                                        current_headings[2] = None
-                                        current_headings[3] = None
-                                        if text not in toc:
-                                            toc[text] = {}
-                                
-                                # Level 2: Title Case, bold/heavy font
-                                elif span["font"].lower().find("bold") > -1 or span["font"].lower().find("heavy") > -1:
-                                    if text.istitle():
-                                        current_headings[1] = text
-                                        current_headings[2] = None
-                                        current_headings[3] = None
-                                        if current_headings[0]:
-                                            if text not in toc[current_headings[0]]:
-                                                toc[current_headings[0]][text] = {}
-
-                                # Level 3: Title Case, regular font
-                                elif text.istitle():
-                                    current_headings[2] = text
-                                    current_headings[3] = None
-                                    if current_headings[0] and current_headings[1]:
-                                        if text not in toc[current_headings[0]][current_headings[1]]:
-                                            toc[current_headings[0]][current_headings[1]][text] = page_num - page_offset + 1
-                                
-                                # Level 4: Normal case
-                                else:
-                                    current_headings[3] = text
-                                    if current_headings[0] and current_headings[1] and current_headings[2]:
-                                        toc[current_headings[0]][current_headings[1]][current_headings[2]] = {text: page_num - page_offset + 1}
+    for page_num, headings in enumerate(page_headings):
+        for level, text in headings:
+            if level == 1:
+                current_headings[0] = text
+                current_headings[1] = None
+                current_headings[2] = None
+                current_headings[3] = None
+                if text not in toc:
+                    toc[text] = {}
+
+            elif level == 2:
+                current_headings[1] = text
+                current_headings[2] = None
+                current_headings[3] = None
+                if current_headings[0]:
+                    if text not in toc[current_headings[0]]:
+                        toc[current_headings[0]][text] = {}
+
+            elif level == 3:
+                current_headings[2] = text
+                current_headings[3] = None
+                if current_headings[0] and current_headings[1]:
+                    if text not in toc[current_headings[0]][current_headings[1]]:
+                        toc[current_headings[0]][current_headings[1]][text] = page_num - page_offset + 1
+
+            else:
+                current_headings[3] = text
+                if current_headings[0] and current_headings[1] and current_headings[2]:
+                    toc[current_headings[0]][current_headings[1]][current_headings[2]] = {text: page_num - page_offset + 1}
     return toc
 
+def _iter_page_headings_in_processes(pdf_path: str, page_count: int, workers: int,
+                                     chunk_size: int) -> Iterator[List[tuple]]:
+    """Classify page ranges in worker processes, yielding each page's headings in order."""
+    with ProcessPoolExecutor(max_workers=workers, mp_context=process_pool_context(),
+                             initializer=_init_toc_worker, initargs=(pdf_path,)) as executor:
+        futures = deque()
+        for start in range(0, page_count, chunk_size):
+            futures.append(executor.submit(_page_range_headings, start, min(start + chunk_size, page_count)))
+            if len(futures) >= 2 * workers:
+                yield from futures.popleft().result()
+        while futures:
+            yield from futures.popleft().result()
+
+# Per-process document used by the TOC worker pool
+_toc_worker_doc = None
+
+def _init_toc_worker(pdf_path: str):
+    global _toc_worker_doc
+    # PyMuPDF documents cannot be shared across processes; each worker opens its own
+    _toc_worker_doc = fitz.open(pdf_path)
+
+def _page_range_headings(start: int, stop: int) -> List[List[tuple]]:
+    return [_page_headings(_toc_worker_doc[i]) for i in range(start, stop)]
+
+def _write_xml_section(xf, tag: str, children: Iterator):
+    """Stream a top-level element of the XML index, indented as pretty_print would."""
+    xf.write('\n  ')
+    first = next(children, None)
+    if first is None:
+        xf.write(etree.Element(tag))
+        return
+    with xf.element(tag):
+        for child in itertools.chain([first], children):
+            etree.indent(child, space='  ', level=2)
+            xf.write('\n    ')
+            xf.write(child)
+        xf.write('\n  ')
+
+class _HeadingPaths(dict):
+    """Entry headings joined for display, each distinct tuple joined once."""
+    def __missing__(self, headings: tuple) -> str:
+        path = self[headings] = ' > '.join([heading for heading in headings if heading])
+        return path
+
 class Exporter:
     def __init__(self, index: Dict, cross_references: Dict, toc: Dict, terms_only: bool = False, suppress_categories: List[str] = None, context_style: str = 'none'):
         self.cross_references = cross_references
         self.terms_only = terms_only
         self.suppress_categories = suppress_categories or []
+        # Looked up once per category of every term, so kept as a set too
+        self._suppress_set = frozenset(self.suppress_categories)
         self.index = self._filter_index(index)
         self.toc = toc
         self.context_style = context_style
+        # Sorted entries and page lists are filled in on first use and shared
+        # by every writer, so sections and formats do not sort them again
+        self._sorted_entries = {}  # (term, category) -> entries in sorted order
+        self._page_numbers = {}  # term -> (1, 2, 5)
+        self._page_lists = {}  # term -> "1, 2, 5"
+        self._entry_texts = {}  # term -> "term: 1, 2, 5", or its context lines
+        self._heading_paths = _HeadingPaths()  # (chapter, section, None, None, None) -> "chapter > section"
+        self._subject_index = None  # see _subject_groups
+        self._section_terms = {}  # 'case_law_references' -> its terms in sorted order
+        self._toc_outline = None  # see _sorted_toc
 
         if self.terms_only:
             self.case_law_references = {}
             self.statutory_references = {}
-            self.subject_matter_index = {k: v for k, v in self.index.items()}
+            self.subject_matter_index = dict(self.index)
         else:
-            self.case_law_references = {k: v for k, v in self.index.items() if 'case_law_references' in v}
-            self.statutory_references = {k: v for k, v in self.index.items() if 'statutory_references' in v}
-            self.subject_matter_index = {k: v for k, v in self.index.items() if 'case_law_references' not in v and 'statutory_references' not in v}
+            self.case_law_references = {}
+            self.statutory_references = {}
+            self.subject_matter_index = {}
+            # One pass over the index; a term can be both case law and statutory
+            for k, v in self.index.items():
+                is_case_law = 'case_law_references' in v
+                is_statutory = 'statutory_references' in v
+                if is_case_law:
+                    self.case_law_references[k] = v
+                if is_statutory:
+                    self.statutory_references[k] = v
+                if not (is_case_law or is_statutory):
+                    self.subject_matter_index[k] = v
 
     def _filter_index(self, index: Dict) -> Dict:
         """Filter out suppressed categories from the index."""
         if not self.suppress_categories:
             return index
         
-        filtered_index = defaultdict(lambda: defaultdict(list))
+        filtered_index = {}
         for term, data in index.items():
+            categories = {}
             new_all_references = []
             # First, build the new filtered categories
             for category, pages in data.items():
-                if category != 'all_references' and category not in self.suppress_categories:
-                    filtered_index[term][category].extend(pages)
+                if category != 'all_references' and category not in self._suppress_set:
+                    categories[category] = list(pages)
                     new_all_references.extend(pages)
-            
-            # If there are any remaining categories, add the new 'all_references'
-            if filtered_index[term]:
-                filtered_index[term]['all_references'] = new_all_references
-
-        return {k: v for k, v in filtered_index.items() if v}
 
-    def _format_entry(self, term, entries):
+            # If there are any remaining categories, add the new 'all_references'
+            if categories:
+                categories['all_references'] = new_all_references
+                filtered_index[term] = categories
+
+        return filtered_index
+
+    def _sorted(self, term: str, category: str = 'all_references') -> list:
+        """Return a term's entries under a category in page order, sorted once per exporter."""
+        entries = self._sorted_entries.get((term, category))
+        if entries is None:
+            # Keyed on the page alone, so snippets are never compared and a
+            # page's entries keep the order they appear in
+            entries = self._sorted_entries[(term, category)] = sorted(self.index[term][category], key=itemgetter(0))
+        return entries
+
+    def _sorted_terms(self, section: str) -> list:
+        """Return the terms of a section dict such as 'statutory_references', sorted once per exporter."""
+        terms = self._section_terms.get(section)
+        if terms is None:
+            terms = self._section_terms[section] = sorted(getattr(self, section))
+        return terms
+
+    def _alphabetical_terms(self) -> list:
+        return self._sorted_terms('subject_matter_index' if self.terms_only else 'index')
+
+    def _pages(self, term: str) -> tuple:
+        """Return the distinct pages a term appears on, in order."""
+        pages = self._page_numbers.get(term)
+        if pages is None:
+            # A set comprehension dedups without a generator frame per entry
+            distinct = {entry[0] for entry in self.index[term]['all_references']}
+            pages = self._page_numbers[term] = tuple(sorted(distinct))
+        return pages
+
+    def _page_list(self, term: str) -> str:
+        """Return the distinct pages a term appears on, joined for display."""
+        pages = self._page_lists.get(term)
+        if pages is None:
+            pages = self._page_lists[term] = _pages_to_str(self._pages(term))
+        return pages
+
+    def _subject_groups(self) -> List:
+        """Return [(category, sorted terms)] for the subject index, sorted by category.
+
+        Built on first use and shared by the text, docx and Markdown writers.
+        """
+        if self._subject_index is None:
+            subject_index = {}
+            excluded = self._suppress_set | {'all_references'}
+            for term, data in self.subject_matter_index.items():
+                for category in data:
+                    if category not in excluded:
+                        subject_index.setdefault(category, []).append(term)
+            self._subject_index = [(category, sorted(terms)) for category, terms in sorted(subject_index.items())]
+        return self._subject_index
+
+    def _sorted_toc(self) -> List:
+        """Return the table of contents with every level sorted, built on first use.
+
+        [(l1, [(l2, [(l3, page, [(l4, page)])])])]; the Level 4 list is empty
+        when a Level 3 heading has no subheading.
+        """
+        if self._toc_outline is None:
+            outline = []
+            for l1, l2_dict in sorted(self.toc.items()):
+                l2_items = []
+                for l2, l3_dict in sorted(l2_dict.items()):
+                    l3_items = []
+                    for l3, l4_val in sorted(l3_dict.items()):
+                        if isinstance(l4_val, dict):
+                            l3_items.append((l3, list(l4_val.values())[0], sorted(l4_val.items())))
+                        else:
+                            l3_items.append((l3, l4_val, []))
+                    l2_items.append((l2, l3_items))
+                outline.append((l1, l2_items))
+            self._toc_outline = outline
+        return self._toc_outline
+
+    def _format_entry(self, term):
+        """Return a term's index entry; a term listed in several sections is formatted once."""
+        text = self._entry_texts.get(term)
+        if text is None:
+            text = self._entry_texts[term] = self._render_entry(term)
+        return text
+
+    def _render_entry(self, term):
+        entries = self.index[term]['all_references']
         if self.context_style == 'none' or len(entries) == 1:
-            pages = sorted(list(set([entry[0] for entry in entries])))
-            return f"{term}: {', '.join(map(str, pages))}"
+            return term + ': ' + self._page_list(term)
         elif self.context_style == 'snippet':
-            output = f"{term}:\n"
-            for page, context, _ in sorted(entries):
-                output += f"  - p. {page}: \"...{context}...\"\n"
-            return output
+            output = [f"{term}:\n"]
+            for page, context, _ in self._sorted(term):
+                output.append(f"  - p. {page}: \"...{context}...\"\n")
+            return "".join(output)
         elif self.context_style == 'headings':
-            output = f"{term}:\n"
-            for page, _, headings in sorted(entries):
-                output += f"  - p. {page}: {' > '.join(filter(None, headings))}\n"
-            return output
+            output = [f"{term}:\n"]
+            heading_paths = self._heading_paths
+            for page, _, headings in self._sorted(term):
+                output.append(f"  - p. {page}: {heading_paths[headings]}\n")
+            return "".join(output)
 
     def to_text(self, include_subcategories: bool = True) -> str:
         """Generate formatted index with the new structure."""
-        output = "COMPREHENSIVE LEGAL INDEX\n"
-        output += "=" * 50 + "\n\n"
+        return "".join(self.iter_text_lines(include_subcategories))
+
+    def iter_text_lines(self, include_subcategories: bool = True) -> Iterator[str]:
+        """Yield the text index piece by piece so it can be written as it is generated."""
+        yield "COMPREHENSIVE LEGAL INDEX\n"
+        yield "=" * 50 + "\n\n"
 
         # Table of Contents
-        output += "TABLE OF CONTENTS\n"
-        output += "-" * 50 + "\n"
-        for l1, l2_dict in sorted(self.toc.items()):
-            output += f"{l1}\n"
-            for l2, l3_dict in sorted(l2_dict.items()):
-                output += f"  {l2}\n"
-                for l3, l4_val in sorted(l3_dict.items()):
-                    if isinstance(l4_val, dict):
-                        output += f"    {l3}: {list(l4_val.values())[0]}\n"
-                        for l4, page in sorted(l4_val.items()):
-                             output += f"      {l4}: {page}\n"
-                    else:
-                        output += f"    {l3}: {l4_val}\n"
-        output += "\n"
+        yield "TABLE OF CONTENTS\n"
+        yield "-" * 50 + "\n"
+        for l1, l2_items in self._sorted_toc():
+            yield f"{l1}\n"
+            for l2, l3_items in l2_items:
+                yield f"  {l2}\n"
+                for l3, l3_page, l4_items in l3_items:
+                    yield f"    {l3}: {l3_page}\n"
+                    for l4, page in l4_items:
+                        yield f"      {l4}: {page}\n"
+        yield "\n"
 
 
         if not self.terms_only:
             # Case Law References
-            if 'case_law_references' not in self.suppress_categories:
-                output += "CASE LAW REFERENCES\n"
-                output += "-" * 50 + "\n"
-                for term, data in sorted(self.case_law_references.items()):
-                    output += self._format_entry(term, data['all_references']) + "\n"
-                output += "\n"
+            if 'case_law_references' not in self._suppress_set:
+                yield "CASE LAW REFERENCES\n"
+                yield "-" * 50 + "\n"
+                for term in self._sorted_terms('case_law_references'):
+                    yield self._format_entry(term) + "\n"
+                yield "\n"
 
             # Statutory References
-            if 'statutory_references' not in self.suppress_categories:
-                output += "STATUTORY REFERENCES\n"
-                output += "-" * 50 + "\n"
-                for term, data in sorted(self.statutory_references.items()):
-                    output += self._format_entry(term, data['all_references']) + "\n"
-                output += "\n"
+            if 'statutory_references' not in self._suppress_set:
+                yield "STATUTORY REFERENCES\n"
+                yield "-" * 50 + "\n"
+                for term in self._sorted_terms('statutory_references'):
+                    yield self._format_entry(term) + "\n"
+                yield "\n"
 
         # Index by Subject
-        output += "INDEX BY SUBJECT\n"
-        output += "-" * 50 + "\n"
-        # Group terms by category
-        subject_index = defaultdict(list)
-        for term, data in sorted(self.subject_matter_index.items()):
-            for category in data:
-                if category != 'all_references' and category not in self.suppress_categories:
-                    subject_index[category].append((term, data['all_references']))
-        
-        for category, terms in sorted(subject_index.items()):
-            output += f"\n-- {category.replace('_', ' ').title()} --\n"
-            for term, entries in sorted(terms):
-                output += self._format_entry(term, entries) + "\n"
-        output += "\n"
+        yield "INDEX BY SUBJECT\n"
+        yield "-" * 50 + "\n"
+        for category, terms in self._subject_groups():
+            yield f"\n-- {category.replace('_', ' ').title()} --\n"
+            for term in terms:
+                yield self._format_entry(term) + "\n"
+        yield "\n"
 
         # Alphabetical Index
-        output += "ALPHABETICAL INDEX\n"
-        output += "-" * 50 + "\n"
+        yield "ALPHABETICAL INDEX\n"
+        yield "-" * 50 + "\n"
         
-        index_source = self.subject_matter_index if self.terms_only else self.index
-        for term, data in sorted(index_source.items()):
-            output += self._format_entry(term, data['all_references']) + "\n"
-        
-        return output
+        for term in self._alphabetical_terms():
+            yield self._format_entry(term) + "\n"
 
     def to_json(self) -> str:
         """Convert index to JSON format with the new structure."""
+        if orjson is None:
+            return json.dumps(self._json_data(), indent=2, ensure_ascii=False)
+        return orjson.dumps(self._json_data(), option=orjson.OPT_INDENT_2).decode('utf-8')
+
+    def dump_json(self, fp):
+        """Write the JSON index as UTF-8 to a binary file object."""
+        if orjson is not None:
+            fp.write(orjson.dumps(self._json_data(), option=orjson.OPT_INDENT_2))
+            return
+        # json.dump writes the encoder's chunks as they come rather than
+        # building the whole document as one string first
+        out = io.TextIOWrapper(fp, encoding='utf-8')
+        json.dump(self._json_data(), out, indent=2, ensure_ascii=False)
+        out.flush()
+        out.detach()
+
+    def _json_data(self) -> Dict:
         if self.terms_only:
-            json_data = {
+            return {
                 'table_of_contents': self.toc,
-                'subject_matter_index': {k: {cat: sorted(pages) for cat, pages in v.items()} for k, v in self.subject_matter_index.items()},
-                '_cross_references': {k: sorted(list(v)) for k, v in self.cross_references.items()}
+                'subject_matter_index': {k: {cat: self._sorted(k, cat) for cat in v} for k, v in self.subject_matter_index.items()},
+                '_cross_references': {k: sorted(v) for k, v in self.cross_references.items()}
             }
-        else:
-            json_data = {
-                'table_of_contents': self.toc,
-                'case_law_references': {k: sorted(v['all_references']) for k, v in self.case_law_references.items()},
-                'statutory_references': {k: sorted(v['all_references']) for k, v in self.statutory_references.items()},
-                'subject_matter_index': {k: {cat: sorted(pages) for cat, pages in v.items()} for k, v in self.subject_matter_index.items()},
-                '_cross_references': {k: sorted(list(v)) for k, v in self.cross_references.items()}
-            }
-        return json.dumps(json_data, indent=2, ensure_ascii=False)
+        return {
+            'table_of_contents': self.toc,
+            'case_law_references': {k: self._sorted(k) for k in self.case_law_references},
+            'statutory_references': {k: self._sorted(k) for k in self.statutory_references},
+            'subject_matter_index': {k: {cat: self._sorted(k, cat) for cat in v} for k, v in self.subject_matter_index.items()},
+            '_cross_references': {k: sorted(v) for k, v in self.cross_references.items()}
+        }
 
     def to_pdf(self, path: str):
-        """Generate a PDF version of the index."""
+        """Generate a PDF version of the index, adding pages as the text fills them."""
         doc = fitz.open()
-        page = doc.new_page(width=595, height=842) # A4 size
-        
-        text = self.to_text()
-        
-        # Use a textbox for better layout control
         rect = fitz.Rect(50, 50, 545, 792)
-        page.insert_textbox(rect, text, fontname="helv", fontsize=10)
-        
+        fontsize = 10
+        font = fitz.Font("helv")
+        # Pages are laid out as insert_textbox lays them out, but it measures
+        # and encodes text one character at a time in Python, so lines are
+        # wrapped with the font's own measurements and each page's text
+        # operators are written here
+        line_factor = font.ascender - font.descender
+        rows_per_page = int((rect.height + font.descender * fontsize) // (fontsize * line_factor))
+        step = fontsize * font.ascender
+        # Each row's text matrix, from the baseline of the first row down
+        row_origins = ["1 0 0 1 %g %g Tm /helv %g Tf " % (rect.x0, 842 - (rect.y0 + step + step * (i * line_factor)), fontsize)
+                       for i in range(rows_per_page)]
+
+        def write_page(rows):
+            # as insert_textbox does, a trailing blank row is not written,
+            # nor is a second one, which its final splitlines() drops
+            for _ in range(2):
+                if rows and not rows[-1]:
+                    rows.pop()
+            page = doc.new_page(width=595, height=842)  # A4 size
+            if rows and not _PDF_DIRECT_TEXT:
+                # The rows already fit the box, so it lays them out unchanged
+                page.insert_textbox(rect, "\n".join(rows), fontname="helv", fontsize=fontsize)
+            elif rows:
+                shape = page.new_shape()
+                page.insert_font(fontname="helv")
+                shape.text_cont = "\nq\nBT\n%sET\nQ\n" % "".join(
+                    f"{row_origin}[<{row.encode('latin-1').hex()}>]TJ\n" for row_origin, row in zip(row_origins, rows))
+                shape.commit()
+
+        # Every piece of the text index ends a line, so pieces are wrapped and
+        # paginated as they come rather than joining the whole index first
+        word_lengths = {}
+        page_rows = []
+        for piece in self.iter_text_lines():
+            # helv is a simple font, which has no glyphs past code 255
+            for line in _PDF_UNENCODABLE_RE.sub('?', piece).splitlines():
+                line_rows = _wrap_pdf_line(line, font, fontsize, rect.width, word_lengths)
+                # A trailing blank row is not written, so it does not count
+                if page_rows and len(page_rows) + len(line_rows) - (not line_rows[-1]) > rows_per_page:
+                    write_page(page_rows)
+                    page_rows = []
+                page_rows.extend(line_rows)
+        if page_rows:
+            write_page(page_rows)
+
         doc.save(path)
         doc.close()
 
     def to_docx(self, path: str, columns: int = 1):
         """Generate a .docx version of the index."""
+        template = _docx_template()
+        if template is None:
+            self._to_docx_with_python_docx(path, columns)
+            return
+
+        # The blank document's parts are copied as they are and document.xml
+        # is streamed in, so the index never becomes an in-memory DOM
+        with zipfile.ZipFile(template) as src:
+            document = etree.fromstring(
+                src.read('word/document.xml'), etree.XMLParser(remove_blank_text=True))
+            if columns > 1:
+                document.find(f'{{{_W_NS}}}body/{{{_W_NS}}}sectPr/{{{_W_NS}}}cols').set(f'{{{_W_NS}}}num', str(columns))
+            # The blank body holds only its section properties, which must come last
+            head, sep, tail = etree.tostring(document, xml_declaration=True, encoding='UTF-8',
+                                             standalone=True).partition(b'<w:sectPr')
+
+            with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as dst:
+                for item in src.infolist():
+                    if item.filename != 'word/document.xml':
+                        dst.writestr(item, src.read(item))
+                        continue
+                    with dst.open('word/document.xml', 'w') as raw:
+                        raw.write(head)
+                        out = io.TextIOWrapper(raw, encoding='utf-8')
+                        out.writelines(_docx_paragraph_xml(text, _DOCX_STYLE_IDS.get(style))
+                                       for text, style in self._iter_docx_paragraphs())
+                        out.flush()
+                        out.detach()
+                        raw.write(sep + tail)
+
+    def _to_docx_with_python_docx(self, path: str, columns: int):
+        # python-docx is slow to import and only needed for this format
+        from docx import Document
+
         doc = Document()
-        section = doc.sections[0]
-        
         if columns > 1:
-            sectPr = section._sectPr
-            cols = sectPr.xpath('./w:cols')[0]
-            cols.set('{http://schemas.openxmlformats.org/wordprocessingml/2006/main}num', str(columns))
+            doc.sections[0]._sectPr.find(f'{{{_W_NS}}}cols').set(f'{{{_W_NS}}}num', str(columns))
+        # Paragraphs are parsed in one go and moved into the body, rather
+        # than built one by one through python-docx's object model
+        paragraphs = etree.fromstring(''.join(itertools.chain(
+            [f'<w:body xmlns:w="{_W_NS}">'],
+            (_docx_paragraph_xml(text, _DOCX_STYLE_IDS.get(style)) for text, style in self._iter_docx_paragraphs()),
+            ['</w:body>'])))
+        # The blank body holds only its section properties, which must come last
+        sect_pr = doc.element.body[-1]
+        for paragraph in list(paragraphs):
+            sect_pr.addprevious(paragraph)
+        doc.save(path)
 
-        doc.add_heading('Comprehensive Legal Index', 0)
+    def _iter_docx_paragraphs(self) -> Iterator[tuple]:
+        """Yield (text, style name) for each paragraph of the docx index."""
+        yield 'Comprehensive Legal Index', 'Title'
 
         # Table of Contents
-        doc.add_heading('Table of Contents', level=1)
-        for l1, l2_dict in sorted(self.toc.items()):
-            doc.add_paragraph(l1, style='Heading 2')
-            for l2, l3_dict in sorted(l2_dict.items()):
-                doc.add_paragraph(l2, style='Heading 3')
-                for l3, l4_val in sorted(l3_dict.items()):
-                    if isinstance(l4_val, dict):
-                        doc.add_paragraph(f"{l3}: {list(l4_val.values())[0]}", style='Heading 4')
-                        for l4, page in sorted(l4_val.items()):
-                             doc.add_paragraph(f"{l4}: {page}", style='Normal')
-                    else:
-                        doc.add_paragraph(f"{l3}: {l4_val}", style='Heading 4')
+        yield 'Table of Contents', 'Heading 1'
+        for l1, l2_items in self._sorted_toc():
+            yield l1, 'Heading 2'
+            for l2, l3_items in l2_items:
+                yield l2, 'Heading 3'
+                for l3, l3_page, l4_items in l3_items:
+                    yield f"{l3}: {l3_page}", 'Heading 4'
+                    for l4, page in l4_items:
+                        yield f"{l4}: {page}", 'Normal'
         
         if not self.terms_only:
             # Case Law References
-            if 'case_law_references' not in self.suppress_categories:
-                doc.add_heading('Case Law References', level=1)
-                for term, data in sorted(self.case_law_references.items()):
-                    doc.add_paragraph(self._format_entry(term, data['all_references']))
+            if 'case_law_references' not in self._suppress_set:
+                yield 'Case Law References', 'Heading 1'
+                for term in self._sorted_terms('case_law_references'):
+                    yield self._format_entry(term), None
 
             # Statutory References
-            if 'statutory_references' not in self.suppress_categories:
-                doc.add_heading('Statutory References', level=1)
-                for term, data in sorted(self.statutory_references.items()):
-                    doc.add_paragraph(self._format_entry(term, data['all_references']))
+            if 'statutory_references' not in self._suppress_set:
+                yield 'Statutory References', 'Heading 1'
+                for term in self._sorted_terms('statutory_references'):
+                    yield self._format_entry(term), None
 
         # Index by Subject
-        doc.add_heading('Index by Subject', level=1)
-        subject_index = defaultdict(list)
-        for term, data in sorted(self.subject_matter_index.items()):
-            for category in data:
-                if category != 'all_references' and category not in self.suppress_categories:
-                    subject_index[category].append((term, data['all_references']))
-        
-        for category, terms in sorted(subject_index.items()):
-            doc.add_heading(category.replace('_', ' ').title(), level=2)
-            for term, entries in sorted(terms):
-                doc.add_paragraph(self._format_entry(term, entries))
+        yield 'Index by Subject', 'Heading 1'
+        for category, terms in self._subject_groups():
+            yield category.replace('_', ' ').title(), 'Heading 2'
+            for term in terms:
+                yield self._format_entry(term), None
 
         # Alphabetical Index
-        doc.add_heading('Alphabetical Index', level=1)
-        index_source = self.subject_matter_index if self.terms_only else self.index
-        for term, data in sorted(index_source.items()):
-            doc.add_paragraph(self._format_entry(term, data['all_references']))
-        
-        doc.save(path)
+        yield 'Alphabetical Index', 'Heading 1'
+        for term in self._alphabetical_terms():
+            yield self._format_entry(term), None
 
     def to_csv(self, path: str):
         """Generate a CSV version of the index."""
-        with open(path, 'w', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(['Term', 'Category', 'Page', 'Context', 'Headings'])
-            
+        # Rows are formatted directly, quoting only the fields that need it,
+        # which gives the same bytes as csv.writer's default dialect
+        with open(path, 'w', newline='', encoding='utf-8', buffering=1 << 16) as f:
+            f.write('Term,Category,Page,Context,Headings\r\n')
+            # There are only a few categories, so each is checked against the
+            # suppressed list and quoted once rather than once per term
+            quoted_cats = {}  # category -> quoted name, or None when suppressed
+            heading_paths = self._heading_paths
             index_source = self.subject_matter_index if self.terms_only else self.index
-            for term, data in sorted(index_source.items()):
-                for cat, entries in data.items():
-                    if entries and cat not in self.suppress_categories:
-                        for page, context, headings in entries:
-                            writer.writerow([term, cat, page, context, ' > '.join(filter(None, headings))])
+            for term in self._alphabetical_terms():
+                quoted_term = _csv_field(term)
+                for cat, entries in index_source[term].items():
+                    if cat not in quoted_cats:
+                        quoted_cats[cat] = None if cat in self._suppress_set else _csv_field(cat)
+                    quoted_cat = quoted_cats[cat]
+                    if entries and quoted_cat is not None:
+                        prefix = f'{quoted_term},{quoted_cat},'
+                        f.writelines(f"{prefix}{page},{_csv_field(context)},{_csv_field(heading_paths[headings])}\r\n"
+                                     for page, context, headings in entries)
 
     def to_xml(self, path: str):
         """Generate an XML version of the index."""
-        root = etree.Element('LegalIndex')
-        
-        # Table of Contents
-        toc_root = etree.SubElement(root, 'TableOfContents')
-        for l1, l2_dict in sorted(self.toc.items()):
-            l1_elem = etree.SubElement(toc_root, 'Heading1', name=l1)
-            for l2, l3_dict in sorted(l2_dict.items()):
+        # Written section by section, so only one entry's subtree is held at a time
+        with open(path, 'wb', buffering=1 << 16) as f:
+            with etree.xmlfile(f, encoding='UTF-8') as xf:
+                xf.write_declaration()
+                with xf.element('LegalIndex'):
+                    _write_xml_section(xf, 'TableOfContents', self._iter_xml_toc())
+                    if not self.terms_only:
+                        if 'case_law_references' not in self._suppress_set:
+                            _write_xml_section(xf, 'CaseLawReferences',
+                                               self._iter_xml_references('case_law_references'))
+                        if 'statutory_references' not in self._suppress_set:
+                            _write_xml_section(xf, 'StatutoryReferences',
+                                               self._iter_xml_references('statutory_references'))
+                    _write_xml_section(xf, 'SubjectMatterIndex', self._iter_xml_subjects())
+                    xf.write('\n')
+            # pretty_print ends the document with a newline
+            f.write(b'\n')
+
+    def _iter_xml_toc(self) -> Iterator:
+        for l1, l2_items in self._sorted_toc():
+            l1_elem = etree.Element('Heading1', name=l1)
+            for l2, l3_items in l2_items:
                 l2_elem = etree.SubElement(l1_elem, 'Heading2', name=l2)
-                for l3, l4_val in sorted(l3_dict.items()):
-                    if isinstance(l4_val, dict):
-                        l3_elem = etree.SubElement(l2_elem, 'Heading3', name=l3, page=str(list(l4_val.values())[0]))
-                        for l4, page in sorted(l4_val.items()):
-                            etree.SubElement(l3_elem, 'Heading4', name=l4, page=str(page))
-                    else:
-                        etree.SubElement(l2_elem, 'Heading3', name=l3, page=str(l4_val))
-
-        if not self.terms_only:
-            # Case Law
-            if 'case_law_references' not in self.suppress_categories:
-                case_law_root = etree.SubElement(root, 'CaseLawReferences')
-                for term, data in sorted(self.case_law_references.items()):
-                    ref_elem = etree.SubElement(case_law_root, 'Reference', name=term)
-                    for page, context, _ in data['all_references']:
-                        etree.SubElement(ref_elem, 'Occurrence', page=str(page)).text = context
-
-            # Statutory
-            if 'statutory_references' not in self.suppress_categories:
-                statutory_root = etree.SubElement(root, 'StatutoryReferences')
-                for term, data in sorted(self.statutory_references.items()):
-                    ref_elem = etree.SubElement(statutory_root, 'Reference', name=term)
-                    for page, context, _ in data['all_references']:
-                        etree.SubElement(ref_elem, 'Occurrence', page=str(page)).text = context
-
-        # Subject Matter
-        subject_root = etree.SubElement(root, 'SubjectMatterIndex')
-        for term, data in sorted(self.subject_matter_index.items()):
-            term_element = etree.SubElement(subject_root, 'Term', name=term)
-            for cat, entries in data.items():
-                if cat not in self.suppress_categories:
+                for l3, l3_page, l4_items in l3_items:
+                    l3_elem = etree.SubElement(l2_elem, 'Heading3', name=l3, page=str(l3_page))
+                    for l4, page in l4_items:
+                        etree.SubElement(l3_elem, 'Heading4', name=l4, page=str(page))
+            yield l1_elem
+
+    def _iter_xml_references(self, section: str) -> Iterator:
+        references = getattr(self, section)
+        for term in self._sorted_terms(section):
+            ref_elem = etree.Element('Reference', name=term)
+            for page, context, _ in references[term]['all_references']:
+                etree.SubElement(ref_elem, 'Occurrence', page=str(page)).text = context
+            yield ref_elem
+
+    def _iter_xml_subjects(self) -> Iterator:
+        for term in self._sorted_terms('subject_matter_index'):
+            term_element = etree.Element('Term', name=term)
+            for cat, entries in self.subject_matter_index[term].items():
+                if cat not in self._suppress_set:
                     cat_element = etree.SubElement(term_element, 'Category', name=cat)
                     for page, context, _ in entries:
                         etree.SubElement(cat_element, 'Occurrence', page=str(page)).text = context
-
-        with open(path, 'wb') as f:
-            f.write(etree.tostring(root, pretty_print=True, xml_declaration=True, encoding='UTF-8'))
+            yield term_element
 
     def to_markdown(self, path: str):
         """Generate a Markdown version of the index."""
-        with open(path, 'w', encoding='utf-8') as f:
-            f.write("# Comprehensive Legal Index\n\n")
+        # One large buffer rather than a small write per line
+        with open(path, 'w', encoding='utf-8', buffering=1 << 16) as f:
+            f.writelines(self.iter_markdown_lines())
 
-            # Table of Contents
-            f.write("## Table of Contents\n")
-            for l1, l2_dict in sorted(self.toc.items()):
-                f.write(f"### {l1}\n")
-                for l2, l3_dict in sorted(l2_dict.items()):
-                    f.write(f"#### {l2}\n")
-                    for l3, l4_val in sorted(l3_dict.items()):
-                        if isinstance(l4_val, dict):
-                            f.write(f"- {l3}: {list(l4_val.values())[0]}\n")
-                            for l4, page in sorted(l4_val.items()):
-                                f.write(f"  - {l4}: {page}\n")
-                        else:
-                            f.write(f"- {l3}: {l4_val}\n")
-            f.write("\n")
-
-
-            if not self.terms_only:
-                if 'case_law_references' not in self.suppress_categories:
-                    f.write("## Case Law References\n")
-                    for term, data in sorted(self.case_law_references.items()):
-                        f.write(f"- {self._format_entry(term, data['all_references'])}\n")
-                    f.write("\n")
-
-                if 'statutory_references' not in self.suppress_categories:
-                    f.write("## Statutory References\n")
-                    for term, data in sorted(self.statutory_references.items()):
-                        f.write(f"- {self._format_entry(term, data['all_references'])}\n")
-                    f.write("\n")
-
-            f.write("## Index by Subject\n")
-            subject_index = defaultdict(list)
-            for term, data in sorted(self.subject_matter_index.items()):
-                for category in data:
-                    if category != 'all_references' and category not in self.suppress_categories:
-                        subject_index[category].append((term, data['all_references']))
-            
-            for category, terms in sorted(subject_index.items()):
-                f.write(f"### {category.replace('_', ' ').title()}\n")
-                for term, entries in sorted(terms):
-                    f.write(f"- {self._format_entry(term, entries)}\n")
-                f.write("\n")
-
-            f.write("## Alphabetical Index\n")
-            index_source = self.subject_matter_index if self.terms_only else self.index
-            for term, data in sorted(index_source.items()):
-                f.write(f"- {self._format_entry(term, data['all_references'])}\n")
+    def iter_markdown_lines(self) -> Iterator[str]:
+        """Yield the Markdown index piece by piece, as iter_text_lines does for text."""
+        yield "# Comprehensive Legal Index\n\n"
+
+        # Table of Contents
+        yield "## Table of Contents\n"
+        for l1, l2_items in self._sorted_toc():
+            yield f"### {l1}\n"
+            for l2, l3_items in l2_items:
+                yield f"#### {l2}\n"
+                for l3, l3_page, l4_items in l3_items:
+                    yield f"- {l3}: {l3_page}\n"
+                    for l4, page in l4_items:
+                        yield f"  - {l4}: {page}\n"
+        yield "\n"
+
+
+        if not self.terms_only:
+            if 'case_law_references' not in self._suppress_set:
+                yield "## Case Law References\n"
+                for term in self._sorted_terms('case_law_references'):
+                    yield f"- {self._format_entry(term)}\n"
+                yield "\n"
+
+            if 'statutory_references' not in self._suppress_set:
+                yield "## Statutory References\n"
+                for term in self._sorted_terms('statutory_references'):
+                    yield f"- {self._format_entry(term)}\n"
+                yield "\n"
+
+        yield "## Index by Subject\n"
+        for category, terms in self._subject_groups():
+            yield f"### {category.replace('_', ' ').title()}\n"
+            for term in terms:
+                yield f"- {self._format_entry(term)}\n"
+            yield "\n"
+
+        yield "## Alphabetical Index\n"
+        for term in self._alphabetical_terms():
+            yield f"- {self._format_entry(term)}\n"
 
 def save_output(path: str, index: Dict, cross_references: Dict, toc: Dict, format: str, include_subcategories: bool = True, terms_only: bool = False, columns: int = 1, suppress_categories: List[str] = None, context_style: str = 'none'):
-    """Save index output in the specified format."""
+    """Save index output in the specified format.
+
+    To write several formats, call save_outputs once so they share one exporter's caches.
+    """
+    save_outputs({path: format}, index, cross_references, toc, include_subcategories=include_subcategories, terms_only=terms_only, columns=columns, suppress_categories=suppress_categories, context_style=context_style)
+
+def save_outputs(outputs: Dict[str, str], index: Dict, cross_references: Dict, toc: Dict, include_subcategories: bool = True, terms_only: bool = False, columns: int = 1, suppress_categories: List[str] = None, context_style: str = 'none'):
+    """Save index output to several {path: format} files from one exporter, writing them concurrently."""
     exporter = Exporter(index, cross_references, toc, terms_only=terms_only, suppress_categories=suppress_categories, context_style=context_style)
-    
+    if len(outputs) <= 1:
+        for path, format in outputs.items():
+            _write_output(exporter, path, format, include_subcategories, columns)
+        return
+
+    # Formats spend most of their time in file I/O and in lxml / PyMuPDF, and
+    # each builds its own document. The exporter's caches may be filled by
+    # two threads at once, but both compute the same value. PyMuPDF is not
+    # thread-safe, so PDFs are written one at a time; see _write_output.
+    with ThreadPoolExecutor(max_workers=min(len(outputs), os.cpu_count() or 1)) as executor:
+        futures = [executor.submit(_write_output, exporter, path, format, include_subcategories, columns)
+                   for path, format in outputs.items()]
+    # Every output is attempted; the first to fail, in the order given, is raised
+    for future in futures:
+        future.result()
+
+# PyMuPDF is not thread-safe; save_outputs' threads take turns writing PDFs
+_PDF_LOCK = threading.Lock()
+
+def _output_mode(path: str, tmp_path: str) -> int:
+    """Return the permission bits for an output replacing path, written at tmp_path."""
+    try:
+        # An existing output keeps its permissions
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        pass
+    # Otherwise the output gets the mode any new file in its directory would
+    # get. Reading the umask means setting it for the whole process, so a
+    # file is created beside the temporary one and its mode read back.
+    probe = tmp_path + '.mode'
+    fd = os.open(probe, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
     try:
+        return stat.S_IMODE(os.fstat(fd).st_mode)
+    finally:
+        os.close(fd)
+        os.remove(probe)
+
+def _write_output(exporter: Exporter, path: str, format: str, include_subcategories: bool, columns: int):
+    # Written to a uniquely named file beside the output and moved into place
+    # once complete, so a failed export raises and never leaves a partial
+    # file at path, and concurrent runs never share a temporary file. A
+    # symlinked output is written through: the file it points to is replaced.
+    target = os.path.realpath(path)
+    fd, tmp_path = tempfile.mkstemp(prefix=os.path.basename(target) + '.', suffix='.tmp',
+                                    dir=os.path.dirname(target))
+    os.close(fd)
+    try:
+        # mkstemp creates the file private to its owner
+        os.chmod(tmp_path, _output_mode(target, tmp_path))
         if format == 'text':
-            with open(path, 'w', encoding='utf-8') as f:
-                f.write(exporter.to_text(include_subcategories))
+            with open(tmp_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                f.writelines(exporter.iter_text_lines(include_subcategories))
         elif format == 'json':
-            with open(path, 'w', encoding='utf-8') as f:
-                f.write(exporter.to_json())
+            with open(tmp_path, 'wb', buffering=1 << 16) as f:
+                exporter.dump_json(f)
         elif format == 'pdf':
-            exporter.to_pdf(path)
+            with _PDF_LOCK:
+                exporter.to_pdf(tmp_path)
         elif format == 'docx':
-            exporter.to_docx(path, columns=columns)
+            exporter.to_docx(tmp_path, columns=columns)
         elif format == 'csv':
-            exporter.to_csv(path)
+            exporter.to_csv(tmp_path)
         elif format == 'xml':
-            exporter.to_xml(path)
+            exporter.to_xml(tmp_path)
         elif format == 'md':
-            exporter.to_markdown(path)
+            exporter.to_markdown(tmp_path)
         else:
             raise ValueError(f"Unsupported format: {format}")
-            
-        print(f"Index saved to: {path}")
-        
-    except Exception as e:
-        print(f"Error saving output: {e}")
+        os.replace(tmp_path, target)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
 
-def get_statistics(index: Dict, page_content: Dict) -> Dict:
+    print(f"Index saved to: {path}")
+
+def get_statistics(index: Dict, total_pages: int, pages_with_content: int) -> Dict:
     """Get statistics about the indexed content."""
     stats = {
         'total_terms': len(index),
-        'total_pages': len(page_content),
-        'pages_with_content': sum(1 for text in page_content.values() if text.strip()),
+        'total_pages': total_pages,
+        'pages_with_content': pages_with_content,
     }
     
-    category_counts = defaultdict(int)
-    for term_data in index.values():
-        for category in term_data.keys():
-            if category != 'all_references':
-                category_counts[category] += 1
-    
+    # Counter tallies the generator in C rather than one += per category
+    category_counts = Counter(category for term_data in index.values()
+                              for category in term_data if category != 'all_references')
+
     stats['terms_by_category'] = dict(category_counts)
     return stats
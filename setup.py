@@ -1,18 +1,33 @@
 
-from setuptools import setup, find_packages
+from setuptools import setup, find_packages, Extension
+try:
+    from Cython.Build import cythonize
+except ImportError:  # Cython is optional; the indexer falls back to pure Python without it
+    cythonize = None
+
+ext_modules = []
+if cythonize is not None:
+    ext_modules = cythonize([Extension('legal_indexer._fast', ['legal_indexer/_fast.pyx'])])
 
 setup(
     name='legal_indexer',
     version='1.0.0',
     packages=find_packages(),
+    ext_modules=ext_modules,
     install_requires=[
         'PyMuPDF==1.23.5',
-        'PyPDF2==3.0.1',
+        'pypdfium2==5.14.0',
         'python-docx==1.1.2',
         'lxml==5.2.2',
         'pytesseract==0.3.10',
         'Pillow==10.4.0',
+        'pyahocorasick==2.3.1',
+        'orjson==3.10.7',
     ],
+    extras_require={
+        're2': ['google-re2'],
+        'hyperscan': ['hyperscan'],
+    },
     entry_points={
         'console_scripts': [
             'legal-indexer = legal_indexer.main:main',
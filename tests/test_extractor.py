@@ -1,12 +1,16 @@
 
+import os
+import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
-from legal_indexer.extractor import extract_text_from_pdf
+import fitz
+from legal_indexer.extractor import extract_text_from_pdf, iter_pages_from_pdf, process_pool_context
 
 class TestExtractor(unittest.TestCase):
 
+    @patch('os.path.exists', return_value=True)
     @patch('fitz.open')
-    def test_extract_text_from_pdf_success(self, mock_fitz_open):
+    def test_extract_text_from_pdf_success(self, mock_fitz_open, mock_exists):
         # Mock the PDF document
         mock_doc = MagicMock()
         mock_doc.page_count = 2
@@ -25,24 +29,64 @@ class TestExtractor(unittest.TestCase):
         self.assertEqual(pages[1], "This is page 1.")
         self.assertEqual(pages[2], "This is page 2.")
 
+    @patch('os.path.exists', return_value=True)
     @patch('fitz.open', side_effect=Exception("PyMuPDF error"))
-    @patch('PyPDF2.PdfReader')
-    def test_extract_text_from_pdf_fallback(self, mock_pdf_reader, mock_fitz_open):
-        # Mock the PDF reader
-        mock_reader = MagicMock()
-        mock_reader.pages = [MagicMock(), MagicMock()]
-        mock_reader.pages[0].extract_text.return_value = "Fallback page 1."
-        mock_reader.pages[1].extract_text.return_value = "Fallback page 2."
-        mock_pdf_reader.return_value = mock_reader
+    @patch('pypdfium2.PdfDocument')
+    def test_extract_text_from_pdf_fallback(self, mock_pdf_document, mock_fitz_open, mock_exists):
+        # Mock the PDFium document
+        mock_pages = [MagicMock(), MagicMock()]
+        mock_pages[0].get_textpage.return_value.get_text_range.return_value = "Fallback page 1.\r\n"
+        mock_pages[1].get_textpage.return_value.get_text_range.return_value = "Fallback page 2."
+        mock_pdf_document.return_value.__iter__.return_value = iter(mock_pages)
 
         # Call the function
-        with patch('builtins.open', unittest.mock.mock_open(read_data=b'')):
-            pages = extract_text_from_pdf("dummy.pdf")
+        pages = extract_text_from_pdf("dummy.pdf")
 
         # Assert the results
         self.assertEqual(len(pages), 2)
-        self.assertEqual(pages[1], "Fallback page 1.")
+        self.assertEqual(pages[1], "Fallback page 1.\n")
         self.assertEqual(pages[2], "Fallback page 2.")
+        mock_pdf_document.return_value.close.assert_called_once()
+
+    @patch('os.path.exists', return_value=True)
+    @patch('pytesseract.image_to_string', return_value="Scanned page.")
+    @patch('legal_indexer.extractor._page_image', return_value=b"P6 1 1 255 ...")
+    @patch('fitz.open')
+    def test_extract_text_from_pdf_ocr_fallback(self, mock_fitz_open, mock_page_image, mock_ocr, mock_exists):
+        # Page 2 has no text layer and must be OCR'd
+        mock_doc = MagicMock()
+        mock_doc.page_count = 3
+        pages = [MagicMock(), MagicMock(), MagicMock()]
+        pages[0].get_text.return_value = "This is page 1."
+        pages[1].get_text.return_value = "  \n"
+        pages[2].get_text.return_value = "This is page 3."
+        mock_doc.__getitem__.side_effect = pages
+        mock_fitz_open.return_value = mock_doc
+
+        pages = extract_text_from_pdf("dummy.pdf")
+
+        self.assertEqual(list(pages), [1, 2, 3])
+        self.assertEqual(pages[2], "Scanned page.")
+        self.assertEqual(pages[3], "This is page 3.")
+        mock_ocr.assert_called_once()
+
+    def test_iter_pages_from_pdf_in_worker_processes(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'doc.pdf')
+            doc = fitz.open()
+            for i in range(5):
+                doc.new_page().insert_text((72, 72), f"Text of page {i + 1}.")
+            doc.save(path)
+            doc.close()
+
+            pages = dict(iter_pages_from_pdf(path, workers=2, chunk_size=2))
+
+        self.assertEqual(list(pages), [1, 2, 3, 4, 5])
+        self.assertEqual(pages[4].strip(), "Text of page 4.")
+
+    def test_worker_pools_never_fork(self):
+        # Pools start while OCR and pool-management threads are running
+        self.assertIn(process_pool_context().get_start_method(), ('forkserver', 'spawn'))
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,140 @@
+
+import importlib
+import importlib.util
+import sys
+import unittest
+from unittest.mock import patch
+import legal_indexer.indexer as indexer_module
+from legal_indexer.indexer import LegalIndexer
+
+class TestIndexer(unittest.TestCase):
+
+    def setUp(self):
+        self.legal_terms = {
+            'torts': ['negligence', 'strict liability', 'damages'],
+            'contracts': ['damages', 'consideration'],
+        }
+
+    def test_predefined_terms_respect_word_boundaries(self):
+        indexer = LegalIndexer(self.legal_terms, terms_only=True)
+        indexer.identify_legal_concepts("Negligence and gross negligence, but not negligences.", 1)
+
+        entries = indexer.index['Negligence']['torts']
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0][0], 1)
+        self.assertNotIn('Consideration', indexer.index)
+
+    def test_term_listed_in_several_categories(self):
+        indexer = LegalIndexer(self.legal_terms, terms_only=True)
+        indexer.identify_legal_concepts("The jury awarded DAMAGES.", 3)
+
+        self.assertIn('torts', indexer.index['Damages'])
+        self.assertIn('contracts', indexer.index['Damages'])
+        self.assertEqual([entry[0] for entry in indexer.index['Damages']['all_references']], [3])
+
+    def test_scan_pages_in_worker_processes(self):
+        indexer = LegalIndexer(self.legal_terms, terms_only=True)
+        pages = [(1, "Negligence caused damages."), (2, " "), (3, "No consideration."), (4, "Strict liability applies.")]
+
+        hits = list(indexer.scan_pages(pages, workers=2, batch_size=1))
+        self.assertEqual(hits, list(indexer.scan_pages(pages)))
+        self.assertEqual([page_num for page_num, _ in hits], [1, 2, 3, 4])
+        self.assertEqual(hits[1], (2, []))
+
+    def test_case_names(self):
+        indexer = LegalIndexer({})
+        indexer.identify_legal_concepts("Smith v. Jones, 12 N.Y.3d 45; one two three four five six v Brown", 1)
+
+        self.assertIn('case_law_references', indexer.index['Smith v. Jones'])
+        # A party name spans at most five words
+        self.assertIn('two three four five six v Brown', indexer.index)
+
+    def test_case_names_inside_citations(self):
+        indexer = LegalIndexer({})
+        indexer.identify_legal_concepts("The clerk listed 25 Smith v. Jones Corp 1990 on the docket.", 1)
+
+        # Overlapping matches of different patterns are each kept
+        self.assertIn('25 Smith v. Jones Corp 1990', indexer.index)
+        self.assertIn('Smith v. Jones Corp', indexer.index)
+
+    def test_overlapping_key_phrases(self):
+        indexer = LegalIndexer({})
+        indexer.extract_key_phrases("A motion for summary judgment alleging breach of duty of care.", 1)
+
+        phrases = [term for term, data in indexer.index.items() if 'key_phrases' in data]
+        # Phrases from different patterns may overlap; within one pattern they do not
+        self.assertEqual(sorted(phrases), ['Breach Of Duty', 'Motion For Summary Judgment', 'Summary Judgment'])
+
+    def test_empty_term_list(self):
+        indexer = LegalIndexer({}, terms_only=True)
+        indexer.identify_legal_concepts("Negligence.", 1)
+        self.assertNotIn('Negligence', indexer.index)
+
+# Optional modules that change how pages are matched or stored, and the module name of each
+_ENGINES = {'re2': 're2', 'hyperscan': 'hyperscan', 'pyahocorasick': 'ahocorasick', 'cython': 'legal_indexer._fast'}
+
+_PAGES = [
+    (1, "In Smith v. Jones, 123 A.D.2d 456 (App. Div. 1990), the court cited Brown v. Board of Educ., "
+        "347 U.S. 483 (1954) and 12 N.Y.3d 45 (Ct. App. 2009). The clerk listed 25 Smith v. Jones Corp 1990 "
+        "and 7 Doe v. Roe 88 on the docket."),
+    (2, "Under CPLR § 3212(b) and N.Y. Gen. Oblig. Law § 5-701(a)(1), see also 42 U.S.C. § 1983, "
+        "Rule 4.01(c) and CPL 440.10. A motion for summary judgment alleging breach of duty of care."),
+    (3, "Negligence and strict liability; gross negligence, damages and consideration. "
+        "Due process, good faith and the statute of limitations (a) (12)."),
+]
+
+class TestOptionalEngines(unittest.TestCase):
+    """Each optional engine must find exactly what the pure-re path finds."""
+
+    legal_terms = {
+        'torts': ['negligence', 'strict liability', 'damages', 'gross negligence'],
+        'contracts': ['damages', 'consideration'],
+    }
+
+    def _scan(self, available):
+        """Return each page's hits and the index, with only the named engines importable."""
+        blocked = {module: None for engine, module in _ENGINES.items() if engine not in available}
+        with patch.dict(sys.modules, blocked):
+            importlib.reload(indexer_module)
+        try:
+            indexer = indexer_module.LegalIndexer(self.legal_terms)
+            hits = []
+            for page_num, text in _PAGES:
+                page_hits = indexer.scan_page(text)
+                indexer.add_hits(page_num, page_hits)
+                hits.append(sorted(page_hits))
+            index = {term: {category: sorted(entries) for category, entries in data.items()}
+                     for term, data in indexer.index.items()}
+            return hits, index
+        finally:
+            importlib.reload(indexer_module)
+
+    def _assert_matches_pure_re(self, engine):
+        if importlib.util.find_spec(_ENGINES[engine]) is None:
+            self.skipTest(f"{engine} is not installed")
+        hits, index = self._scan({engine})
+        pure_hits, pure_index = self._scan(set())
+        self.assertEqual(hits, pure_hits)
+        self.assertEqual(index, pure_index)
+        self.assertIn('Smith v. Jones Corp', index)
+
+    def test_re2(self):
+        self._assert_matches_pure_re('re2')
+
+    def test_hyperscan_prefilter(self):
+        self._assert_matches_pure_re('hyperscan')
+
+    def test_aho_corasick(self):
+        self._assert_matches_pure_re('pyahocorasick')
+
+    def test_compiled_merge_hits(self):
+        self._assert_matches_pure_re('cython')
+
+    def test_all_engines(self):
+        if not all(importlib.util.find_spec(module) for module in _ENGINES.values()):
+            self.skipTest("not every optional engine is installed")
+        hits, index = self._scan(set(_ENGINES))
+        self.assertEqual((hits, index), self._scan(set()))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,212 @@
+
+import csv
+import json
+import os
+import stat
+import tempfile
+import unittest
+from contextlib import redirect_stdout
+from io import StringIO
+from unittest.mock import patch
+import fitz
+import docx
+from legal_indexer.indexer import LegalIndexer
+from legal_indexer.utils import Exporter, save_output, save_outputs
+
+_PAGES = [
+    (1, "In Smith v. Jones, 123 A.D.2d 456 (App. Div. 1990), the court granted summary judgment."),
+    (2, "Under CPLR § 3212(b), negligence and damages must be shown; see Brown v. Board of Educ."),
+    (3, "The Corporation owed a fiduciary duty. Negligence, \"consideration\", and good faith."),
+]
+
+_TOC = {
+    'CHAPTER 1 GENERAL PROVISIONS': {
+        'Motion Practice': {'Summary Judgment Standards': 1, 'Pleadings': {'Amendments': 2}},
+    },
+}
+
+def _index(pages=_PAGES):
+    """Index the sample pages, as main.py does."""
+    indexer = LegalIndexer({'torts': ['negligence', 'damages'], 'contracts': ['consideration']})
+    for page_num, hits in indexer.scan_pages(pages):
+        indexer.add_hits(page_num, hits)
+    indexer.build_cross_references()
+    return indexer.index, indexer.cross_references
+
+def _pdf_text(path: str) -> str:
+    doc = fitz.open(path)
+    try:
+        return ''.join(page.get_text() for page in doc)
+    finally:
+        doc.close()
+
+class TestSaveOutputs(unittest.TestCase):
+
+    def setUp(self):
+        self.index, self.cross_references = _index()
+        self.exporter = Exporter(self.index, self.cross_references, _TOC)
+
+    def test_several_formats_in_one_call(self):
+        formats = ['text', 'json', 'pdf', 'pdf', 'docx', 'csv', 'xml', 'md']
+        extensions = {'text': 'txt'}
+        with tempfile.TemporaryDirectory() as tmp:
+            outputs = {os.path.join(tmp, f'index{i}.{extensions.get(f, f)}'): f for i, f in enumerate(formats)}
+            with redirect_stdout(StringIO()):
+                save_outputs(outputs, self.index, self.cross_references, _TOC)
+
+            # Every output is in place and no temporary file is left behind
+            self.assertEqual(sorted(os.listdir(tmp)), sorted(map(os.path.basename, outputs)))
+            with open(os.path.join(tmp, 'index0.txt'), encoding='utf-8') as f:
+                self.assertEqual(f.read(), self.exporter.to_text())
+            with open(os.path.join(tmp, 'index1.json'), 'rb') as f:
+                self.assertEqual(json.load(f), json.loads(self.exporter.to_json()))
+            with open(os.path.join(tmp, 'index7.md'), encoding='utf-8') as f:
+                self.assertEqual(f.read(), ''.join(self.exporter.iter_markdown_lines()))
+            # The two PDFs were written in turn and come out the same
+            self.assertEqual(_pdf_text(os.path.join(tmp, 'index2.pdf')), _pdf_text(os.path.join(tmp, 'index3.pdf')))
+
+class TestWriteOutput(unittest.TestCase):
+
+    def setUp(self):
+        self.index, self.cross_references = _index()
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.path = os.path.join(self.tmp.name, 'index.csv')
+
+    def _save(self, path):
+        with redirect_stdout(StringIO()):
+            save_output(path, self.index, self.cross_references, _TOC, 'csv')
+
+    def _mode(self, path):
+        return stat.S_IMODE(os.stat(path).st_mode)
+
+    def test_failed_export_keeps_previous_output(self):
+        with open(self.path, 'w') as f:
+            f.write('previous')
+
+        def fail_part_way(exporter, path):
+            with open(path, 'w') as f:
+                f.write('Term,Category')
+            raise RuntimeError('disk full')
+
+        with patch.object(Exporter, 'to_csv', fail_part_way):
+            with self.assertRaises(RuntimeError):
+                self._save(self.path)
+
+        with open(self.path) as f:
+            self.assertEqual(f.read(), 'previous')
+        self.assertEqual(os.listdir(self.tmp.name), ['index.csv'])
+
+    def test_new_output_gets_a_new_file_mode(self):
+        probe = os.path.join(self.tmp.name, 'probe')
+        open(probe, 'w').close()
+        self._save(self.path)
+        self.assertEqual(self._mode(self.path), self._mode(probe))
+
+    def test_replaced_output_keeps_its_mode_and_symlink(self):
+        with open(self.path, 'w') as f:
+            f.write('previous')
+        os.chmod(self.path, 0o640)
+        link = os.path.join(self.tmp.name, 'latest.csv')
+        os.symlink(self.path, link)
+
+        self._save(link)
+
+        self.assertTrue(os.path.islink(link))
+        self.assertEqual(self._mode(self.path), 0o640)
+        with open(self.path, newline='') as f:
+            self.assertTrue(f.read().startswith('Term,Category,Page,Context,Headings\r\n'))
+        self.assertEqual(sorted(os.listdir(self.tmp.name)), ['index.csv', 'latest.csv'])
+
+class TestPdf(unittest.TestCase):
+
+    def setUp(self):
+        # Enough snippets, some wider than a row, to fill several pages
+        pages = [(i * len(_PAGES) + page_num, text) for i in range(30) for page_num, text in _PAGES]
+        self.exporter = Exporter(*_index(pages), _TOC, context_style='snippet')
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _pages(self):
+        path = os.path.join(self.tmp.name, 'index.pdf')
+        self.exporter.to_pdf(path)
+        doc = fitz.open(path)
+        try:
+            return [page.get_text() for page in doc]
+        finally:
+            doc.close()
+
+    def test_text_matches_to_text(self):
+        pages = self._pages()
+        self.assertGreater(len(pages), 1)
+        # Long lines are wrapped onto several rows, so words are compared
+        self.assertEqual(''.join(pages).split(), self.exporter.to_text().split())
+
+    def test_insert_textbox_layout_matches(self):
+        # Used when the installed PyMuPDF is not the release to_pdf writes text streams for
+        direct = self._pages()
+        with patch('legal_indexer.utils._PDF_DIRECT_TEXT', False):
+            self.assertEqual(self._pages(), direct)
+
+class TestDocx(unittest.TestCase):
+
+    def setUp(self):
+        pages = _PAGES + [(4, "Smith & Sons v. Jones <Holdings> LLC\x0c\x01 owed a duty of care\tin Negligence.\x0b")]
+        self.exporter = Exporter(*_index(pages), _TOC, context_style='snippet')
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def _paragraphs(self, path):
+        document = docx.Document(path)
+        columns = document.sections[0]._sectPr.find(docx.oxml.ns.qn('w:cols')).get(docx.oxml.ns.qn('w:num'))
+        return [(p.style.name, p.text) for p in document.paragraphs], columns
+
+    def test_matches_python_docx(self):
+        for columns in (1, 2):
+            streamed = os.path.join(self.tmp.name, f'streamed{columns}.docx')
+            built = os.path.join(self.tmp.name, f'built{columns}.docx')
+            self.exporter.to_docx(streamed, columns=columns)
+            self.exporter._to_docx_with_python_docx(built, columns)
+
+            paragraphs, num = self._paragraphs(streamed)
+            self.assertEqual((paragraphs, num), self._paragraphs(built))
+            self.assertEqual(num, None if columns == 1 else '2')
+            styles = {style for style, _ in paragraphs}
+            self.assertEqual(styles, {'Title', 'Heading 1', 'Heading 2', 'Heading 3', 'Heading 4', 'Normal'})
+
+    def test_markup_and_control_characters(self):
+        path = os.path.join(self.tmp.name, 'index.docx')
+        self.exporter.to_docx(path)
+
+        text = '\n'.join(text for _, text in self._paragraphs(path)[0])
+        self.assertIn('Smith & Sons v. Jones <Holdings> LLC owed a duty of care\tin Negligence.', text)
+        self.assertNotRegex(text, '[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+class TestCsv(unittest.TestCase):
+
+    def test_round_trip_through_csv_reader(self):
+        headings = ('Chapter 1, "General"', ' Part A ', None, 'Line\nbreak', 'Carriage\rreturn')
+        entries = [(1, 'a, b and "c"', headings), (2, '  leading and trailing  ', (None,) * 5),
+                   (3, 'over\r\ntwo lines', ('"', ',', '', None, None))]
+        index = {'Smith, "Jr." v. Jones ': {'case_law_references': entries, 'all_references': entries},
+                 'Plain': {'key_phrases': entries[:1], 'all_references': entries[:1]}}
+        expected = [['Term', 'Category', 'Page', 'Context', 'Headings']]
+        for term in sorted(index):
+            for category, category_entries in index[term].items():
+                expected.extend([term, category, str(page), context, ' > '.join(filter(None, entry_headings))]
+                                for page, context, entry_headings in category_entries)
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'index.csv')
+            Exporter(index, {}, {}).to_csv(path)
+            with open(path, newline='', encoding='utf-8') as f:
+                written = f.read()
+
+        self.assertEqual(list(csv.reader(StringIO(written, newline=''))), expected)
+        # Quoted exactly as csv.writer's default dialect quotes
+        out = StringIO(newline='')
+        csv.writer(out).writerows(expected)
+        self.assertEqual(written, out.getvalue())
+
+if __name__ == '__main__':
+    unittest.main()